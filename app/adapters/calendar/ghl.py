@@ -7,11 +7,43 @@ from datetime import datetime, timedelta
 from typing import Any, Optional
 from zoneinfo import ZoneInfo
 
-from app.adapters.calendar.slots import get_stub_slots
+from app.adapters.calendar.slots import get_stub_slots, parse_utc
 
 
 BASE_URL = "https://services.leadconnectorhq.com"
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=ZoneInfo("UTC"))
+
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for GHL calendar reads (reuses TCP+TLS across calls)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=BASE_URL,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=30),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _to_epoch_ms(dt: datetime) -> int:
+    """Epoch milliseconds via integer timedelta arithmetic (no float round-trip)."""
+    if dt.tzinfo is None:
+        # Naive datetimes keep timestamp()'s local-time interpretation
+        return int(dt.timestamp() * 1000)
+    d = dt - _EPOCH
+    return d.days * 86_400_000 + d.seconds * 1000 + d.microseconds // 1000
+
 
 async def get_free_slots(
     access_token: str,
@@ -27,11 +59,10 @@ async def get_free_slots(
     if stub_slots is not None:
         return stub_slots, "stub-trace-id"
 
-    url = f"{BASE_URL}/calendars/{calendar_id}/free-slots"
     # GHL expects Unix timestamps in milliseconds
     params: dict[str, Any] = {
-        "startDate": int(start_dt.timestamp() * 1000),
-        "endDate": int(end_dt.timestamp() * 1000),
+        "startDate": _to_epoch_ms(start_dt),
+        "endDate": _to_epoch_ms(end_dt),
         "timezone": timezone,
     }
     if user_id:
@@ -43,8 +74,9 @@ async def get_free_slots(
         "Version": "2021-07-28",
     }
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        r = await client.get(url, params=params, headers=headers)
+    r = await _get_client().get(
+        f"/calendars/{calendar_id}/free-slots", params=params, headers=headers
+    )
 
     if r.status_code == 401:
         raise RuntimeError("Unauthorized: check token + calendars.readonly scope")
@@ -53,12 +85,11 @@ async def get_free_slots(
     data = r.json()
     trace_id = data.get("traceId")
 
-    slots: list[str] = []
+    # Ordered set: collects and de-dupes slots in a single pass
+    seen: dict[str, None] = {}
 
     for day, blob in data.items():
-        if day == "traceId":
-            continue
-        if not isinstance(blob, dict):
+        if day == "traceId" or not isinstance(blob, dict):
             continue
 
         day_slots = blob.get("slots")
@@ -67,18 +98,10 @@ async def get_free_slots(
 
         # slots are strings like "2026-01-27T20:00:00Z"
         for s in day_slots:
-            if isinstance(s, str):
-                slots.append(s)
-
-    # de-dupe while preserving order
-    seen: set[str] = set()
-    slots_out: list[str] = []
-    for s in slots:
-        if s not in seen:
-            seen.add(s)
-            slots_out.append(s)
+            if type(s) is str:
+                seen[s] = None
 
-    return slots_out, trace_id
+    return list(seen), trace_id
 
 
 BOOKING_STUB_ENABLED_KEY = "BOOKING_STUB"
@@ -184,9 +207,7 @@ async def book_slot(
             return {"success": False, "error": "missing_calendar_id"}
 
         # Parse slot times
-        slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-        if slot_dt.tzinfo is None:
-            slot_dt = slot_dt.replace(tzinfo=ZoneInfo("UTC"))
+        slot_dt = parse_utc(slot_iso)
         slot_duration = int(cal.get("slot_duration_minutes") or 60)
         end_dt = slot_dt + timedelta(minutes=slot_duration)
 
@@ -6,11 +6,47 @@ no provider-specific logic. Used by all calendar adapters.
 """
 from __future__ import annotations
 
-import json
+import functools
 import os
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
+import orjson
+
+_UTC = ZoneInfo("UTC")
+
+_WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Local hour -> time category: 0 = morning (<12), 1 = afternoon (12-17), 2 = evening (17+)
+_HOUR_TO_CAT = bytes([0] * 12 + [1] * 5 + [2] * 7)
+# Contrasting category for slot B: morning -> afternoon, afternoon/evening -> morning
+_CONTRAST = (1, 0, 0)
+
+
+@functools.lru_cache(maxsize=64)
+def _tz(name: str) -> ZoneInfo:
+    """Return a cached ZoneInfo for a tenant timezone name."""
+    return ZoneInfo(name)
+
+
+def parse_utc(slot_iso: str) -> datetime:
+    """Parse an ISO slot string to an aware datetime (naive is assumed UTC)."""
+    if slot_iso.endswith("Z"):
+        return datetime.fromisoformat(slot_iso[:-1]).replace(tzinfo=_UTC)
+    slot_dt = datetime.fromisoformat(slot_iso)
+    if slot_dt.tzinfo is None:
+        return slot_dt.replace(tzinfo=_UTC)
+    return slot_dt
+
+
+def _parse_local(slot_iso: str, tz: ZoneInfo) -> tuple[datetime, datetime] | None:
+    """Parse an ISO slot string to (utc_dt, local_dt), or None if unparseable."""
+    try:
+        slot_dt = parse_utc(slot_iso)
+        return slot_dt, slot_dt.astimezone(tz)
+    except ValueError:
+        return None
+
 
 def get_stub_slots() -> list[str] | None:
     """
@@ -24,35 +60,63 @@ def get_stub_slots() -> list[str] | None:
     raw = os.getenv("CALENDAR_STUB_SLOTS", "").strip()
     if not raw:
         return None
+    slots = _parse_stub_slots(raw)
+    return list(slots) if slots is not None else None
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_stub_slots(raw: str) -> tuple[str, ...] | None:
+    """Parse the stub env value once per distinct value (keyed on the raw string)."""
     try:
-        slots = json.loads(raw)
-        if isinstance(slots, list) and all(isinstance(s, str) for s in slots):
-            return slots
-        return None
-    except json.JSONDecodeError:
+        slots = orjson.loads(raw)
+    except orjson.JSONDecodeError:
         return None
+    if isinstance(slots, list) and all(isinstance(s, str) for s in slots):
+        return tuple(slots)
+    return None
+
+
+def _hhmm_to_minutes(value: str) -> int:
+    """Convert an "HH:MM" string to minutes past midnight."""
+    hours, _, minutes = value.partition(":")
+    return int(hours) * 60 + int(minutes or 0)
+
+
+def _compile_windows(
+    availability: dict[str, list[dict[str, str]]],
+) -> dict[str, list[tuple[int, int]]]:
+    """Convert availability windows to (start, end) minute-of-day bounds per day key."""
+    compiled: dict[str, list[tuple[int, int]]] = {}
+    for day_key, windows in availability.items():
+        bounds: list[tuple[int, int]] = []
+        for window in windows or ():
+            try:
+                bounds.append((
+                    _hhmm_to_minutes(window.get("start", "00:00")),
+                    _hhmm_to_minutes(window.get("end", "23:59")),
+                ))
+            except ValueError:
+                continue
+        compiled[day_key] = bounds
+    return compiled
 
 
-def filter_slots_by_signals(
+def filter_slots(
     slots: list[str],
-    day: str | None,
-    time_window: str | None,
+    day: str | None = None,
+    time_window: str | None = None,
+    availability: dict[str, list[dict[str, str]]] | None = None,
     timezone: str = "Europe/London",
     explicit_date: int | None = None,
 ) -> list[str]:
     """
-    Filter slots by day, time_window, and optional explicit_date signals.
-
-    day: 'monday', 'tuesday', ..., 'today', 'tomorrow'
-    time_window: 'morning' (before 12), 'afternoon' (12-17), 'evening' (17+)
-    explicit_date: day-of-month integer (1-31), e.g. 6 from "Friday 6th"
+    Filter slots by availability windows and day / time_window / explicit_date
+    signals in a single pass (each slot is parsed once, results sorted once).
 
-    Slots are ISO strings in UTC (e.g., "2026-01-30T00:00:00Z").
-    Filtering is done in tenant timezone, returns original ISO strings sorted chronologically.
+    See filter_slots_by_signals and filter_by_availability_windows for the
+    meaning of each argument. Returns original ISO strings sorted chronologically.
     """
-    tz = ZoneInfo(timezone)
-    utc = ZoneInfo("UTC")
-    now = datetime.now(tz)
+    tz = _tz(timezone)
 
     # Map day names to weekday integers (0=Monday)
     day_map = {
@@ -67,30 +131,46 @@ def filter_slots_by_signals(
         "evening": (17, 24),
     }
 
+    day_abbrev = {
+        0: "mon", 1: "tue", 2: "wed", 3: "thu",
+        4: "fri", 5: "sat", 6: "sun",
+    }
+
+    # Resolve predicates once, outside the slot loop
+    target_date = None
+    target_weekday = None
+    if day == "today":
+        target_date = datetime.now(tz).date()
+    elif day == "tomorrow":
+        target_date = (datetime.now(tz) + timedelta(days=1)).date()
+    elif day in day_map:
+        target_weekday = day_map[day]
+
+    hour_range = window_ranges.get(time_window) if time_window else None
+    compiled = _compile_windows(availability) if availability else None
+
     # Parse and convert slots to tenant timezone for filtering
     filtered: list[tuple[datetime, str]] = []
     for slot_iso in slots:
-        try:
-            slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-            # Ensure timezone-aware (assume UTC if naive)
-            if slot_dt.tzinfo is None:
-                slot_dt = slot_dt.replace(tzinfo=utc)
-            # Convert to tenant timezone for filtering
-            slot_local = slot_dt.astimezone(tz)
-        except ValueError:
+        p = _parse_local(slot_iso, tz)
+        if p is None:
             continue
+        slot_dt, slot_local = p
+
+        # Availability windows (no windows defined for a day = not available)
+        if compiled is not None:
+            windows = compiled.get(day_abbrev[slot_local.weekday()])
+            if not windows:
+                continue
+            slot_m = slot_local.hour * 60 + slot_local.minute
+            if not any(start_m <= slot_m < end_m for start_m, end_m in windows):
+                continue
 
         # Filter by day (using local date)
-        if day:
-            if day == "today":
-                if slot_local.date() != now.date():
-                    continue
-            elif day == "tomorrow":
-                if slot_local.date() != (now + timedelta(days=1)).date():
-                    continue
-            elif day in day_map:
-                if slot_local.weekday() != day_map[day]:
-                    continue
+        if target_date is not None and slot_local.date() != target_date:
+            continue
+        if target_weekday is not None and slot_local.weekday() != target_weekday:
+            continue
 
         # Filter by specific calendar date (day-of-month), e.g. "the 6th"
         if explicit_date is not None:
@@ -98,8 +178,8 @@ def filter_slots_by_signals(
                 continue
 
         # Filter by time window (using local hour)
-        if time_window and time_window in window_ranges:
-            start_hour, end_hour = window_ranges[time_window]
+        if hour_range is not None:
+            start_hour, end_hour = hour_range
             if not (start_hour <= slot_local.hour < end_hour):
                 continue
 
@@ -110,6 +190,55 @@ def filter_slots_by_signals(
     return [slot_iso for _, slot_iso in filtered]
 
 
+def filter_slots_by_signals(
+    slots: list[str],
+    day: str | None,
+    time_window: str | None,
+    timezone: str = "Europe/London",
+    explicit_date: int | None = None,
+) -> list[str]:
+    """
+    Filter slots by day, time_window, and optional explicit_date signals.
+
+    day: 'monday', 'tuesday', ..., 'today', 'tomorrow'
+    time_window: 'morning' (before 12), 'afternoon' (12-17), 'evening' (17+)
+    explicit_date: day-of-month integer (1-31), e.g. 6 from "Friday 6th"
+
+    Slots are ISO strings in UTC (e.g., "2026-01-30T00:00:00Z").
+    Filtering is done in tenant timezone, returns original ISO strings sorted chronologically.
+    """
+    return filter_slots(
+        slots,
+        day=day,
+        time_window=time_window,
+        timezone=timezone,
+        explicit_date=explicit_date,
+    )
+
+
+def filter_by_availability_windows(
+    slots: list[str],
+    availability: dict[str, list[dict[str, str]]] | None,
+    timezone: str = "Europe/London",
+) -> list[str]:
+    """
+    Filter slots by tenant-configured availability windows.
+
+    availability format:
+    {
+        "mon": [{"start": "09:00", "end": "17:00"}],
+        "tue": [{"start": "09:00", "end": "12:00"}, {"start": "14:00", "end": "17:00"}],
+        ...
+    }
+
+    If availability is None or empty, returns all slots unfiltered.
+    Slots are UTC ISO strings; filtering is done in tenant local time.
+    """
+    if not availability:
+        return slots
+    return filter_slots(slots, availability=availability, timezone=timezone)
+
+
 def pick_soonest_two_slots(
     slots: list[str],
     timezone: str = "Europe/London",
@@ -128,26 +257,13 @@ def pick_soonest_two_slots(
     if not slots:
         return []
 
-    tz = ZoneInfo(timezone)
-    utc = ZoneInfo("UTC")
+    tz = _tz(timezone)
 
     def parse_slot(slot_iso: str) -> tuple[datetime, datetime, str] | None:
-        try:
-            slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-            if slot_dt.tzinfo is None:
-                slot_dt = slot_dt.replace(tzinfo=utc)
-            local_dt = slot_dt.astimezone(tz)
-            return (slot_dt, local_dt, slot_iso)
-        except ValueError:
+        p = _parse_local(slot_iso, tz)
+        if p is None:
             return None
-
-    def get_time_category(local_dt: datetime) -> str:
-        hour = local_dt.hour
-        if hour < 12:
-            return "morning"
-        elif hour < 17:
-            return "afternoon"
-        return "evening"
+        return (p[0], p[1], slot_iso)
 
     # Parse preference-matched slots
     parsed: list[tuple[datetime, datetime, str]] = []
@@ -165,51 +281,47 @@ def pick_soonest_two_slots(
     # If target_hour is set, re-sort by proximity to that time of day then pick nearest 2
     if target_hour is not None:
         parsed.sort(key=lambda x: abs(x[1].hour + x[1].minute / 60 - target_hour))
-        result = [iso for _, _, iso in parsed[:2]]
-        result_parsed = [(datetime.fromisoformat(iso.replace("Z", "+00:00")), iso) for iso in result]
-        result_parsed.sort(key=lambda x: x[0])
-        return [iso for _, iso in result_parsed]
+        nearest = parsed[:2]
+        nearest.sort(key=lambda x: x[0])
+        return [iso for _, _, iso in nearest]
 
     # Slot A = first preference-matched slot (closest to user preference)
     slot_a_utc, slot_a_local, slot_a_iso = parsed[0]
-    slot_a_category = get_time_category(slot_a_local)
-
-    # Determine contrasting category
-    if slot_a_category == "morning":
-        contrast_category = "afternoon"
-    elif slot_a_category == "afternoon":
-        contrast_category = "morning"
-    else:  # evening
-        contrast_category = "morning"  # contrast evening with morning
-
-    # Parse contrast pool (or use slots if not provided)
-    pool = contrast_pool if contrast_pool else slots
-    pool_parsed: list[tuple[datetime, datetime, str]] = []
-    for slot_iso in pool:
-        p = parse_slot(slot_iso)
-        if p and p[2] != slot_a_iso:  # exclude slot A
-            pool_parsed.append(p)
 
-    pool_parsed.sort(key=lambda x: x[0])
+    # Determine contrasting category (evening contrasts with morning)
+    contrast_category = _CONTRAST[_HOUR_TO_CAT[slot_a_local.hour]]
+
+    # Contrast pool: reuse the already parsed + sorted slots when no separate
+    # pool is given (or the caller passed slots itself); otherwise parse it.
+    pool_parsed: list[tuple[datetime, datetime, str]]
+    if not contrast_pool or contrast_pool is slots:
+        pool_parsed = [p for p in parsed if p[2] != slot_a_iso]  # exclude slot A
+    else:
+        pool_parsed = []
+        for slot_iso in contrast_pool:
+            p = parse_slot(slot_iso)
+            if p and p[2] != slot_a_iso:  # exclude slot A
+                pool_parsed.append(p)
+        pool_parsed.sort(key=lambda x: x[0])
 
     # Look for contrasting slot in pool
-    slot_b_iso: str | None = None
-    for utc_dt, local_dt, iso in pool_parsed:
-        if get_time_category(local_dt) == contrast_category:
-            slot_b_iso = iso
+    slot_b: tuple[datetime, datetime, str] | None = None
+    for p in pool_parsed:
+        if _HOUR_TO_CAT[p[1].hour] == contrast_category:
+            slot_b = p
             break
 
     # Fallback: next chronological from preference-matched slots (excluding A)
-    if not slot_b_iso and len(parsed) > 1:
-        slot_b_iso = parsed[1][2]
+    if slot_b is None and len(parsed) > 1:
+        slot_b = parsed[1]
 
     # Build result
-    if slot_b_iso:
-        # Sort A and B chronologically
-        result = [slot_a_iso, slot_b_iso]
-        result_parsed = [(datetime.fromisoformat(iso.replace("Z", "+00:00")), iso) for iso in result]
-        result_parsed.sort(key=lambda x: x[0])
-        return [iso for _, iso in result_parsed]
+    if slot_b is not None:
+        # Sort A and B chronologically (reuse the already-parsed UTC times)
+        slot_b_utc, _, slot_b_iso = slot_b
+        if slot_a_utc <= slot_b_utc:
+            return [slot_a_iso, slot_b_iso]
+        return [slot_b_iso, slot_a_iso]
 
     # Only one slot available
     return [slot_a_iso]
@@ -222,85 +334,13 @@ def format_slots_for_display(slots: list[str], timezone: str = "Europe/London")
     Slots are UTC ISO strings (e.g., "2026-01-30T14:00:00Z").
     Output: "Friday 09:00" in tenant local time.
     """
-    tz = ZoneInfo(timezone)
-    utc = ZoneInfo("UTC")
+    tz = _tz(timezone)
     formatted: list[str] = []
     for slot_iso in slots:
-        try:
-            slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-            if slot_dt.tzinfo is None:
-                slot_dt = slot_dt.replace(tzinfo=utc)
-            # Convert to tenant local time for display
-            local_dt = slot_dt.astimezone(tz)
-            formatted.append(local_dt.strftime("%A %H:%M"))
-        except ValueError:
+        # Convert to tenant local time for display
+        p = _parse_local(slot_iso, tz)
+        if p is None:
             continue
+        local_dt = p[1]
+        formatted.append(f"{_WEEKDAYS[local_dt.weekday()]} {local_dt.hour:02d}:{local_dt.minute:02d}")
     return formatted
-
-
-def filter_by_availability_windows(
-    slots: list[str],
-    availability: dict[str, list[dict[str, str]]] | None,
-    timezone: str = "Europe/London",
-) -> list[str]:
-    """
-    Filter slots by tenant-configured availability windows.
-
-    availability format:
-    {
-        "mon": [{"start": "09:00", "end": "17:00"}],
-        "tue": [{"start": "09:00", "end": "12:00"}, {"start": "14:00", "end": "17:00"}],
-        ...
-    }
-
-    If availability is None or empty, returns all slots unfiltered.
-    Slots are UTC ISO strings; filtering is done in tenant local time.
-    """
-    if not availability:
-        return slots
-
-    tz = ZoneInfo(timezone)
-    utc = ZoneInfo("UTC")
-
-    day_abbrev = {
-        0: "mon", 1: "tue", 2: "wed", 3: "thu",
-        4: "fri", 5: "sat", 6: "sun",
-    }
-
-    filtered: list[tuple[datetime, str]] = []
-    for slot_iso in slots:
-        try:
-            slot_dt = datetime.fromisoformat(slot_iso.replace("Z", "+00:00"))
-            if slot_dt.tzinfo is None:
-                slot_dt = slot_dt.replace(tzinfo=utc)
-            local_dt = slot_dt.astimezone(tz)
-        except ValueError:
-            continue
-
-        # Get day abbreviation
-        day_key = day_abbrev.get(local_dt.weekday())
-        if not day_key:
-            continue
-
-        # Get windows for this day
-        windows = availability.get(day_key)
-        if not windows:
-            # No windows defined for this day = not available
-            continue
-
-        # Check if slot falls within any window
-        slot_time = local_dt.strftime("%H:%M")
-        in_window = False
-        for window in windows:
-            start = window.get("start", "00:00")
-            end = window.get("end", "23:59")
-            if start <= slot_time < end:
-                in_window = True
-                break
-
-        if in_window:
-            filtered.append((slot_dt, slot_iso))
-
-    # Sort chronologically
-    filtered.sort(key=lambda x: x[0])
-    return [iso for _, iso in filtered]
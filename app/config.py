@@ -17,6 +17,8 @@ class Settings:
     anthropic_api_key: str = os.getenv("ANTHROPIC_API_KEY", "")
     instantly_api_key: str = os.getenv("INSTANTLY_API_KEY", "")
     instantly_campaign_id: str = os.getenv("INSTANTLY_CAMPAIGN_ID", "")
+    pipeline_concurrency: int = int(os.getenv("PIPELINE_CONCURRENCY", "16"))
+    claude_concurrency: int = int(os.getenv("CLAUDE_CONCURRENCY", "8"))
 
     # Document portal
     portal_tenant_slug: str = os.getenv("PORTAL_TENANT_SLUG", "humtech")
@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import hashlib
 import json
+import re
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Iterable, Optional
 
+import orjson
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class NormalizedWebhookEvent:
     tenant_id: Optional[str]
     provider: str
@@ -23,6 +28,18 @@ class NormalizedWebhookEvent:
     lead_name: Optional[str]
 
 
+_PROVIDER = sys.intern("ghl")
+
+
+# GHL sends a handful of distinct type strings, so each is classified once
+@lru_cache(maxsize=256)
+def _classify_event_type(event_type_raw: str) -> str:
+    raw_lower = event_type_raw.lower()
+    if "stage" in raw_lower or "status" in raw_lower or "pipeline" in raw_lower:
+        return "stage_changed"
+    return "lead_created"
+
+
 def _deep_get(data: dict[str, Any], *path: str) -> Any:
     cur: Any = data
     for key in path:
@@ -45,6 +62,25 @@ def _parse_dt(value: Any) -> datetime:
         return datetime.fromtimestamp(float(value), tz=timezone.utc)
     if isinstance(value, str) and value.strip():
         txt = value.strip()
+        # Fast path for GHL's usual "2026-02-15T10:00:00Z" shape. Anything not
+        # exactly that (ASCII digits, fixed separators) takes the general path.
+        if (
+            len(txt) == 20
+            and txt.isascii()
+            and txt[4] == txt[7] == "-"
+            and txt[10] == "T"
+            and txt[13] == txt[16] == ":"
+            and txt[19] == "Z"
+            and (txt[0:4] + txt[5:7] + txt[8:10] + txt[11:13] + txt[14:16] + txt[17:19]).isdigit()
+        ):
+            try:
+                return datetime(
+                    int(txt[0:4]), int(txt[5:7]), int(txt[8:10]),
+                    int(txt[11:13]), int(txt[14:16]), int(txt[17:19]),
+                    tzinfo=timezone.utc,
+                )
+            except ValueError:
+                pass
         if txt.endswith("Z"):
             txt = txt[:-1] + "+00:00"
         try:
@@ -57,6 +93,17 @@ def _parse_dt(value: Any) -> datetime:
     return datetime.now(tz=timezone.utc)
 
 
+_UUID_MATCH = re.compile(
+    r"\A[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\Z", re.IGNORECASE
+).match
+
+
+@lru_cache(maxsize=4096)
+def _validated_tenant(value: str) -> Optional[str]:
+    # Same few tenant ids on every webhook from a workspace — validate each once
+    return value if _UUID_MATCH(value) else None
+
+
 def _to_float(value: Any) -> Optional[float]:
     if value is None:
         return None
@@ -77,6 +124,9 @@ def parse_ghl_webhook(payload: dict[str, Any]) -> NormalizedWebhookEvent:
     """
     opportunity = payload.get("opportunity")
     contact = payload.get("contact")
+    opportunity_obj = opportunity if isinstance(opportunity, dict) else {}
+    # Used twice below (lead id fallback and contact id) — look it up once
+    top_contact_id = _first_non_empty(payload, "contactId", "contact_id")
 
     lead_external_id = (
         _first_non_empty(
@@ -86,30 +136,27 @@ def parse_ghl_webhook(payload: dict[str, Any]) -> NormalizedWebhookEvent:
             "leadId",
             "lead_id",
         )
-        or (opportunity.get("id") if isinstance(opportunity, dict) else None)
+        or opportunity_obj.get("id")
         or _first_non_empty(payload, "id")
-        or _first_non_empty(payload, "contactId", "contact_id")
+        or top_contact_id
     )
     if not lead_external_id:
         raise ValueError("Missing lead external id in GHL webhook payload")
 
     contact_external_id = (
-        _first_non_empty(payload, "contactId", "contact_id")
+        top_contact_id
         or (contact.get("id") if isinstance(contact, dict) else None)
-        or _deep_get(opportunity if isinstance(opportunity, dict) else {}, "contact", "id")
+        or _deep_get(opportunity_obj, "contact", "id")
     )
 
     raw_stage = (
         _first_non_empty(payload, "stage", "stageName", "pipelineStage", "pipleline_stage", "pipeline_stage")
-        or (opportunity.get("stage") if isinstance(opportunity, dict) else None)
+        or opportunity_obj.get("stage")
         or _deep_get(payload, "meta", "stage")
     )
 
     event_type_raw = _first_non_empty(payload, "type", "event", "eventType", "triggerType") or ""
-    event_type = "lead_created"
-    raw_lower = event_type_raw.lower()
-    if "stage" in raw_lower or "status" in raw_lower or "pipeline" in raw_lower:
-        event_type = "stage_changed"
+    event_type = _classify_event_type(event_type_raw)
     # GHL contact webhooks have no type field — infer from presence of raw_stage
     if event_type == "lead_created" and raw_stage:
         event_type = "stage_changed"
@@ -141,17 +188,18 @@ def parse_ghl_webhook(payload: dict[str, Any]) -> NormalizedWebhookEvent:
         or _deep_get(payload, "location", "id")
         or _deep_get(payload, "customData", "locationId")
         or _deep_get(payload, "meta", "locationId")
-        or _deep_get(opportunity if isinstance(opportunity, dict) else {}, "locationId")
+        or opportunity_obj.get("locationId")
     )
 
-    tenant_id = _first_non_empty(payload, "tenant_id", "tenantId")
+    tenant_hint = _first_non_empty(payload, "tenant_id", "tenantId")
+    tenant_id = _validated_tenant(tenant_hint) if tenant_hint else None
 
     lead_value = _to_float(
         payload.get("lead_value")
         or payload.get("monetaryValue")
         or payload.get("value")
         or payload.get("amount")
-        or (opportunity.get("monetaryValue") if isinstance(opportunity, dict) else None)
+        or opportunity_obj.get("monetaryValue")
     )
 
     contact_obj = contact if isinstance(contact, dict) else {}
@@ -174,7 +222,7 @@ def parse_ghl_webhook(payload: dict[str, Any]) -> NormalizedWebhookEvent:
 
     return NormalizedWebhookEvent(
         tenant_id=tenant_id,
-        provider="ghl",
+        provider=_PROVIDER,
         lead_external_id=lead_external_id,
         contact_external_id=contact_external_id,
         raw_stage=raw_stage,
@@ -187,3 +235,21 @@ def parse_ghl_webhook(payload: dict[str, Any]) -> NormalizedWebhookEvent:
         lead_name=lead_name,
     )
 
+
+def parse_ghl_webhooks(payloads: Iterable[dict[str, Any]]) -> list[NormalizedWebhookEvent]:
+    """
+    Parse a batch of GHL webhook payloads (e.g. a redelivery burst) in one call.
+    Raises ValueError on the first payload without a lead external id.
+    """
+    parse = parse_ghl_webhook
+    return [parse(payload) for payload in payloads]
+
+
+def parse_ghl_webhook_bytes(raw: bytes) -> NormalizedWebhookEvent:
+    """
+    Parse a raw GHL webhook body (JSON bytes) straight into the internal contract.
+    """
+    payload = orjson.loads(raw)
+    if not isinstance(payload, dict):
+        raise ValueError("GHL webhook payload must be a JSON object")
+    return parse_ghl_webhook(payload)
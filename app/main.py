@@ -14,6 +14,7 @@ logging.basicConfig(
 )
 from .config import settings
 from .db import init_db_pool, close_db_pool, get_pool
+from .adapters.calendar.ghl import close_http_client as close_ghl_calendar_client
 from .bot.jobs import claim_jobs, mark_done, mark_retry
 from .bot.processor import process_job
 from .bot.sender import send_pending_outbound
@@ -43,6 +44,7 @@ async def _startup():
 
 @app.on_event("shutdown")
 async def _shutdown():
+    await close_ghl_calendar_client()
     await close_db_pool()
 
 @app.get("/health")
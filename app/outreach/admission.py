@@ -0,0 +1,80 @@
+"""
+Adaptive admission control for outbound API calls (Claude).
+
+A counter guarded by an asyncio.Condition rather than an asyncio.Semaphore,
+so the limit can be changed while callers are waiting: shrinking takes effect
+as in-flight calls finish, growing wakes waiters immediately.
+
+Usage:
+    admission = AdmissionController(8)
+    async with admission:
+        await client.messages.create(...)
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    def __init__(self, limit: int, *, min_limit: int = 1) -> None:
+        self.max_limit = max(limit, min_limit)
+        self.min_limit = min_limit
+        self._limit = self.max_limit
+        self._active = 0
+        self._cond = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    async def acquire(self) -> None:
+        """Wait until fewer than `limit` calls are in flight, then take a slot."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._active < self._limit)
+            self._active += 1
+
+    async def release(self) -> None:
+        # Decrement first so a cancelled release can't leak the slot
+        self._active -= 1
+        await asyncio.shield(self._notify(1))
+
+    async def resize(self, limit: int) -> None:
+        """Set a new limit (clamped to [min_limit, max_limit]) and wake waiters."""
+        limit = max(self.min_limit, min(limit, self.max_limit))
+        if limit == self._limit:
+            return
+        self._limit = limit
+        await asyncio.shield(self._notify(None))
+
+    async def on_rate_limited(self) -> None:
+        """Provider pushed back (429 / 529) — halve the limit."""
+        new_limit = max(self.min_limit, self._limit // 2)
+        if new_limit < self._limit:
+            logger.warning("Admission: rate limited, concurrency %d -> %d", self._limit, new_limit)
+        await self.resize(new_limit)
+
+    async def on_success(self) -> None:
+        """Call succeeded — grow the limit back by one towards max_limit."""
+        if self._limit < self.max_limit:
+            await self.resize(self._limit + 1)
+
+    async def _notify(self, n: int | None) -> None:
+        async with self._cond:
+            if n is None:
+                self._cond.notify_all()
+            else:
+                self._cond.notify(n)
+
+    async def __aenter__(self) -> "AdmissionController":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import Any, Optional
 from datetime import date
@@ -11,11 +12,8 @@ import asyncpg
 # SQL
 # ---------------------------------------------------------------------------
 
-IS_SUPPRESSED_SQL = """
-SELECT 1 FROM outreach.suppressions
-WHERE email = $1::text
-   OR (domain IS NOT NULL AND domain = $2::text)
-LIMIT 1;
+ALL_SUPPRESSIONS_SQL = """
+SELECT email, domain FROM outreach.suppressions;
 """
 
 INSERT_LEAD_SQL = """
@@ -30,6 +28,33 @@ ON CONFLICT (email) DO NOTHING
 RETURNING lead_id::text;
 """
 
+# Array variant of INSERT_LEAD_SQL — one statement per batch, returns the
+# ids of rows actually inserted (existing emails are skipped).
+INSERT_LEADS_UNNEST_SQL = """
+INSERT INTO outreach.leads (
+    email, first_name, last_name, title,
+    company, company_domain, linkedin_url,
+    industry, employee_count, city, apollo_id, batch_date,
+    campaign_name
+)
+SELECT
+    u.email, u.first_name, u.last_name, u.title,
+    u.company, u.company_domain, u.linkedin_url,
+    u.industry, u.employee_count, u.city, u.apollo_id, $12::date,
+    $13::text
+FROM unnest(
+    $1::text[], $2::text[], $3::text[], $4::text[],
+    $5::text[], $6::text[], $7::text[],
+    $8::text[], $9::int[], $10::text[], $11::text[]
+) AS u(
+    email, first_name, last_name, title,
+    company, company_domain, linkedin_url,
+    industry, employee_count, city, apollo_id
+)
+ON CONFLICT (email) DO NOTHING
+RETURNING lead_id::text, email;
+"""
+
 INSERT_ENRICHMENT_SQL = """
 INSERT INTO outreach.enrichment (lead_id, signals)
 VALUES ($1::uuid, $2::jsonb);
@@ -46,6 +71,7 @@ VALUES (
     $5::numeric, $6::jsonb, $7::jsonb, $8,
     $9, $10, $11
 )
+ON CONFLICT (lead_id) DO NOTHING
 RETURNING personalisation_id::text;
 """
 
@@ -54,7 +80,9 @@ INSERT INTO outreach.events (lead_id, event_type, meta)
 VALUES ($1::uuid, $2::text, $3::jsonb);
 """
 
-GET_BATCH_SQL = """
+# Review batch for one day plus its totals in one round-trip: the counts
+# ride along on every row as window aggregates.
+GET_BATCH_WITH_COUNTS_SQL = """
 SELECT
     l.lead_id::text,
     l.first_name,
@@ -75,7 +103,11 @@ SELECT
     p.evidence_used,
     p.risk_flags,
     p.removed,
-    l.status AS lead_status
+    l.status AS lead_status,
+    COUNT(*) FILTER (WHERE p.review_status = 'auto_send')    OVER () AS total_auto_send,
+    COUNT(*) FILTER (WHERE p.review_status = 'needs_review') OVER () AS total_needs_review,
+    COUNT(*) FILTER (WHERE p.review_status = 'blocked')      OVER () AS total_blocked,
+    COUNT(*) FILTER (WHERE l.status = 'sent')                OVER () AS total_sent
 FROM outreach.leads l
 JOIN outreach.personalisation p ON p.lead_id = l.lead_id
 WHERE l.batch_date = $1::date
@@ -89,17 +121,6 @@ ORDER BY
     p.confidence_score DESC;
 """
 
-GET_BATCH_COUNTS_SQL = """
-SELECT
-    COUNT(*) FILTER (WHERE p.review_status = 'auto_send'    AND p.removed = FALSE) AS auto_send,
-    COUNT(*) FILTER (WHERE p.review_status = 'needs_review' AND p.removed = FALSE) AS needs_review,
-    COUNT(*) FILTER (WHERE p.review_status = 'blocked'      AND p.removed = FALSE) AS blocked,
-    COUNT(*) FILTER (WHERE l.status = 'sent'                AND p.removed = FALSE) AS sent
-FROM outreach.leads l
-JOIN outreach.personalisation p ON p.lead_id = l.lead_id
-WHERE l.batch_date = $1::date;
-"""
-
 UPDATE_OPENER_SQL = """
 UPDATE outreach.personalisation
 SET edited_opener = $2::text
@@ -130,6 +151,52 @@ WHERE l.batch_date = $1::date
   AND l.status NOT IN ('sent', 'failed', 'suppressed');
 """
 
+# Pipeline work queue: claim one lead of a batch + campaign for processing.
+# 'new' leads first; 'processing' ones whose worker died are reclaimed once stale.
+# Suppression is re-checked here — leads left over from earlier runs were only
+# checked at import, and may have unsubscribed since.
+CLAIM_NEXT_LEAD_SQL = """
+UPDATE outreach.leads
+SET status = 'processing', updated_at = now()
+WHERE lead_id = (
+    SELECT l.lead_id
+    FROM outreach.leads l
+    WHERE l.batch_date = $1::date
+      AND l.campaign_name IS NOT DISTINCT FROM $2::text
+      AND (
+          l.status = 'new'
+          OR (l.status = 'processing' AND l.updated_at < now() - make_interval(secs => $3))
+      )
+      AND NOT EXISTS (
+          SELECT 1 FROM outreach.suppressions s
+          WHERE s.email = l.email
+             OR (s.domain IS NOT NULL AND s.domain = l.company_domain)
+      )
+    ORDER BY l.created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+)
+RETURNING
+    lead_id::text, email, first_name, last_name, title,
+    company, company_domain, linkedin_url,
+    industry, employee_count, city, apollo_id;
+"""
+
+# Only the worker that still holds the claim may finish or fail a lead: if the
+# claim went stale and another worker reclaimed and finished it, no row matches.
+MARK_LEAD_PERSONALISED_SQL = """
+UPDATE outreach.leads SET status = 'personalised', updated_at = now()
+WHERE lead_id = $1::uuid AND status = 'processing'
+RETURNING lead_id::text;
+"""
+
+# 'pipeline_failed' (not 'failed', which send_batch uses for Instantly push failures)
+RELEASE_FAILED_LEAD_SQL = """
+UPDATE outreach.leads SET status = 'pipeline_failed', updated_at = now()
+WHERE lead_id = $1::uuid AND status = 'processing'
+RETURNING lead_id::text;
+"""
+
 MARK_LEAD_SENT_SQL = """
 UPDATE outreach.leads SET status = 'sent', updated_at = now()
 WHERE lead_id = $1::uuid;
@@ -140,19 +207,82 @@ UPDATE outreach.leads SET status = 'failed', updated_at = now()
 WHERE lead_id = $1::uuid;
 """
 
+MARK_LEADS_SENT_SQL = """
+UPDATE outreach.leads SET status = 'sent', updated_at = now()
+WHERE lead_id = ANY($1::uuid[]);
+"""
+
+MARK_LEADS_FAILED_SQL = """
+UPDATE outreach.leads SET status = 'failed', updated_at = now()
+WHERE lead_id = ANY($1::uuid[]);
+"""
+
+# One event of the same type per lead id, in a single statement.
+INSERT_EVENTS_FOR_LEADS_SQL = """
+INSERT INTO outreach.events (lead_id, event_type)
+SELECT unnest($1::uuid[]), $2::text;
+"""
+
 INSERT_SUPPRESSION_SQL = """
 INSERT INTO outreach.suppressions (email, domain, reason)
 VALUES ($1, $2, $3)
 ON CONFLICT (email) DO NOTHING;
 """
 
+GET_LLM_CACHE_SQL = """
+SELECT response
+FROM outreach.llm_cache
+WHERE cache_key = $1
+  AND expires_at > now();
+"""
+
+PUT_LLM_CACHE_SQL = """
+INSERT INTO outreach.llm_cache (cache_key, kind, response, model, expires_at)
+VALUES ($1, $2, $3::jsonb, $4, now() + make_interval(days => $5))
+ON CONFLICT (cache_key) DO UPDATE
+SET response   = EXCLUDED.response,
+    model      = EXCLUDED.model,
+    created_at = now(),
+    expires_at = EXCLUDED.expires_at;
+"""
+
+# ---------------------------------------------------------------------------
+# Suppression cache
+# ---------------------------------------------------------------------------
+
+# The block list is small and read-heavy, so each process keeps a copy.
+# insert_suppression invalidates it; the TTL covers writes from other processes.
+SUPPRESSION_CACHE_TTL_SECONDS = 300
+
+_suppression_cache: tuple[float, frozenset[str], frozenset[str]] | None = None
+
+
+def invalidate_suppression_cache() -> None:
+    global _suppression_cache
+    _suppression_cache = None
+
+
 # ---------------------------------------------------------------------------
 # Public functions
 # ---------------------------------------------------------------------------
 
-async def is_suppressed(conn: asyncpg.Connection, email: str, domain: Optional[str]) -> bool:
-    row = await conn.fetchrow(IS_SUPPRESSED_SQL, email, domain)
-    return row is not None
+async def get_suppression_sets(
+    conn: asyncpg.Connection,
+) -> tuple[frozenset[str], frozenset[str]]:
+    """
+    Return (suppressed_emails, suppressed_domains) for the whole block list,
+    served from the process cache while it is fresh.
+    """
+    global _suppression_cache
+    now = time.monotonic()
+    if _suppression_cache is None or now - _suppression_cache[0] > SUPPRESSION_CACHE_TTL_SECONDS:
+        rows = await conn.fetch(ALL_SUPPRESSIONS_SQL)
+        _suppression_cache = (
+            now,
+            frozenset(r["email"] for r in rows if r["email"]),
+            frozenset(r["domain"] for r in rows if r["domain"]),
+        )
+    return _suppression_cache[1], _suppression_cache[2]
 
 
 async def insert_lead(
@@ -182,6 +312,40 @@ async def insert_lead(
     )
 
 
+async def insert_leads_returning(
+    conn: asyncpg.Connection,
+    leads: list[dict[str, Any]],
+    *,
+    batch_date: date,
+    campaign_name: Optional[str] = None,
+) -> dict[str, str]:
+    """
+    Insert a batch of normalised leads in one statement.
+
+    Returns {email: lead_id} for the rows inserted; emails that already
+    exist are skipped and absent from the result.
+    """
+    if not leads:
+        return {}
+    rows = await conn.fetch(
+        INSERT_LEADS_UNNEST_SQL,
+        [lead["email"] for lead in leads],
+        [lead["first_name"] for lead in leads],
+        [lead.get("last_name") for lead in leads],
+        [lead.get("title") for lead in leads],
+        [lead.get("company") for lead in leads],
+        [lead.get("company_domain") for lead in leads],
+        [lead.get("linkedin_url") for lead in leads],
+        [lead.get("industry") for lead in leads],
+        [lead.get("employee_count") for lead in leads],
+        [lead.get("city") for lead in leads],
+        [lead.get("apollo_id") for lead in leads],
+        batch_date,
+        campaign_name,
+    )
+    return {r["email"]: r["lead_id"] for r in rows}
+
+
 async def insert_enrichment(
     conn: asyncpg.Connection, *, lead_id: str, signals: dict[str, Any]
 ) -> None:
@@ -202,7 +366,8 @@ async def insert_personalisation(
     review_status: str,
     prompt_version: str = "v1.0",
     model: Optional[str] = None,
-) -> str:
+) -> Optional[str]:
+    """Insert a lead's personalisation; None if the lead already has one."""
     return await conn.fetchval(
         INSERT_PERSONALISATION_SQL,
         lead_id, opener_first_line, micro_insight, angle_tag,
@@ -221,14 +386,33 @@ async def log_event(
     await conn.execute(INSERT_EVENT_SQL, lead_id, event_type, meta or {})
 
 
-async def get_batch(conn: asyncpg.Connection, batch_date: date) -> list[dict]:
-    rows = await conn.fetch(GET_BATCH_SQL, batch_date)
-    return [dict(r) for r in rows]
-
-
-async def get_batch_counts(conn: asyncpg.Connection, batch_date: date) -> dict:
-    row = await conn.fetchrow(GET_BATCH_COUNTS_SQL, batch_date)
-    return dict(row) if row else {"auto_send": 0, "needs_review": 0, "blocked": 0, "sent": 0}
+async def log_events_bulk(
+    conn: asyncpg.Connection,
+    rows: list[tuple[str, str, Optional[dict[str, Any]]]],
+) -> None:
+    """Insert many (lead_id, event_type, meta) events in one executemany call."""
+    if rows:
+        await conn.executemany(
+            INSERT_EVENT_SQL,
+            [(lead_id, event_type, meta or {}) for lead_id, event_type, meta in rows],
+        )
+
+
+async def get_batch_with_counts(
+    conn: asyncpg.Connection, batch_date: date
+) -> tuple[list[asyncpg.Record], dict]:
+    """Review rows for a batch date plus per-status totals in a single query. Returns (rows, counts)."""
+    rows = await conn.fetch(GET_BATCH_WITH_COUNTS_SQL, batch_date)
+    if not rows:
+        return rows, {"auto_send": 0, "needs_review": 0, "blocked": 0, "sent": 0}
+    first = rows[0]
+    counts = {
+        "auto_send": first["total_auto_send"],
+        "needs_review": first["total_needs_review"],
+        "blocked": first["total_blocked"],
+        "sent": first["total_sent"],
+    }
+    return rows, counts
 
 
 async def update_opener(
@@ -241,19 +425,58 @@ async def remove_lead(conn: asyncpg.Connection, *, personalisation_id: str) -> N
     await conn.execute(REMOVE_LEAD_SQL, personalisation_id)
 
 
-async def get_sendable_leads(conn: asyncpg.Connection, batch_date: date) -> list[dict]:
-    rows = await conn.fetch(GET_SENDABLE_LEADS_SQL, batch_date)
-    return [dict(r) for r in rows]
+async def get_sendable_leads(conn: asyncpg.Connection, batch_date: date) -> list[asyncpg.Record]:
+    return await conn.fetch(GET_SENDABLE_LEADS_SQL, batch_date)
 
 
 async def mark_lead_sent(conn: asyncpg.Connection, lead_id: str) -> None:
     await conn.execute(MARK_LEAD_SENT_SQL, lead_id)
 
 
+async def claim_next_lead(
+    conn: asyncpg.Connection,
+    *,
+    batch_date: date,
+    campaign_name: Optional[str],
+    stale_after_seconds: int,
+) -> Optional[asyncpg.Record]:
+    """Claim the next unprocessed lead (status -> 'processing'), or None when the batch is drained."""
+    return await conn.fetchrow(CLAIM_NEXT_LEAD_SQL, batch_date, campaign_name, float(stale_after_seconds))
+
+
+async def mark_lead_personalised(conn: asyncpg.Connection, lead_id: str) -> bool:
+    """Move a claimed lead to 'personalised'. False if this worker no longer holds the claim."""
+    return await conn.fetchval(MARK_LEAD_PERSONALISED_SQL, lead_id) is not None
+
+
+async def release_failed_lead(conn: asyncpg.Connection, lead_id: str) -> bool:
+    """
+    Mark a claimed lead 'pipeline_failed' so it isn't left stuck in 'processing'.
+    False if this worker no longer holds the claim.
+    """
+    return await conn.fetchval(RELEASE_FAILED_LEAD_SQL, lead_id) is not None
+
+
 async def mark_lead_failed(conn: asyncpg.Connection, lead_id: str) -> None:
     await conn.execute(MARK_LEAD_FAILED_SQL, lead_id)
 
 
+async def mark_leads_sent(conn: asyncpg.Connection, lead_ids: list[str]) -> None:
+    await conn.execute(MARK_LEADS_SENT_SQL, lead_ids)
+
+
+async def mark_leads_failed(conn: asyncpg.Connection, lead_ids: list[str]) -> None:
+    await conn.execute(MARK_LEADS_FAILED_SQL, lead_ids)
+
+
+async def log_events_for_leads(
+    conn: asyncpg.Connection, lead_ids: list[str], event_type: str
+) -> None:
+    """Log the same event type for many leads in one statement."""
+    if lead_ids:
+        await conn.execute(INSERT_EVENTS_FOR_LEADS_SQL, lead_ids, event_type)
+
+
 async def insert_suppression(
     conn: asyncpg.Connection,
     *,
@@ -262,3 +485,21 @@ async def insert_suppression(
     reason: str,
 ) -> None:
     await conn.execute(INSERT_SUPPRESSION_SQL, email, domain, reason)
+    invalidate_suppression_cache()
+
+
+async def get_llm_cache(conn: asyncpg.Connection, cache_key: str) -> Optional[dict[str, Any]]:
+    """Return a cached (unexpired) Claude response, or None on miss."""
+    return await conn.fetchval(GET_LLM_CACHE_SQL, cache_key)
+
+
+async def put_llm_cache(
+    conn: asyncpg.Connection,
+    *,
+    cache_key: str,
+    kind: str,
+    response: dict[str, Any],
+    model: Optional[str],
+    ttl_days: int,
+) -> None:
+    await conn.execute(PUT_LLM_CACHE_SQL, cache_key, kind, response, model, ttl_days)
@@ -1,34 +1,52 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import logging
 import random
 import re
 from datetime import date
+from html.parser import HTMLParser
 from pathlib import Path
 from typing import Any, Optional
 
 import httpx
+import orjson
 from anthropic import AsyncAnthropic
 
 from app.config import settings
 from app.db import get_pool
+from app.outreach.admission import AdmissionController
 from app.outreach.models import (
+    claim_next_lead,
+    get_llm_cache,
+    get_suppression_sets,
     insert_enrichment,
-    insert_lead,
+    insert_leads_returning,
     insert_personalisation,
     insert_suppression,
-    is_suppressed,
     log_event,
+    log_events_bulk,
+    mark_lead_personalised,
+    put_llm_cache,
+    release_failed_lead,
 )
 
 logger = logging.getLogger(__name__)
 
 PROMPT_VERSION = "v1.0"
+# Website-analysis prompt; part of its cache key, so bump it when that prompt changes
+WEBSITE_PROMPT_VERSION = "v1.1"
 PERSONALISATION_MODEL = "claude-sonnet-4-6"
 ENRICHMENT_MODEL = "claude-haiku-4-5-20251001"
 
+# Claude response cache lifetime (outreach.llm_cache)
+WEBSITE_CACHE_TTL_DAYS = 30
+
+# A lead left in 'processing' this long is assumed abandoned and reclaimed
+PROCESSING_STALE_SECONDS = 900
+
 # Fallback defaults (used when campaign.json is missing)
 TEMPLATE_CONTEXT = (
     "HumTech offers a done-for-you AI Revenue Engine — AI booking bot, "
@@ -72,20 +90,153 @@ def _extract_json(text: str) -> str:
     return m.group(1).strip() if m else text.strip()
 
 
-async def _call_claude_with_retry(client: AsyncAnthropic, max_retries: int = 3, **kwargs) -> Any:
-    """Call Claude API with exponential backoff on 529 (overloaded) errors."""
+async def _stream_claude_json(
+    client: AsyncAnthropic,
+    max_retries: int = 3,
+    *,
+    admission: AdmissionController | None = None,
+    **kwargs,
+) -> str:
+    """
+    Stream a Claude response and return the first complete top-level JSON
+    object as text, closing the stream as soon as it is balanced (trailing
+    prose / fences are never generated). Retries 429 / 5xx / overloaded errors.
+    """
+    return await _retry_claude(lambda: _read_json_stream(client, **kwargs), max_retries, admission)
+
+
+async def _read_json_stream(client: AsyncAnthropic, **kwargs) -> str:
+    buf: list[str] = []
+    start = -1      # offset of the opening brace in the joined text
+    depth = 0
+    in_string = False
+    escaped = False
+    pos = 0
+    async with client.messages.stream(**kwargs) as stream:
+        async for chunk in stream.text_stream:
+            buf.append(chunk)
+            for ch in chunk:
+                if start < 0:
+                    if ch == "{":
+                        start, depth = pos, 1
+                elif in_string:
+                    if escaped:
+                        escaped = False
+                    elif ch == "\\":
+                        escaped = True
+                    elif ch == '"':
+                        in_string = False
+                elif ch == '"':
+                    in_string = True
+                elif ch == "{":
+                    depth += 1
+                elif ch == "}":
+                    depth -= 1
+                    if depth == 0:
+                        # Leaving the context manager closes the stream
+                        return "".join(buf)[start:pos + 1]
+                pos += 1
+    # Stream ended without a balanced object — let the caller's parser decide
+    return "".join(buf)
+
+
+# Claude errors worth retrying: rate limited, overloaded, transient server errors
+_CLAUDE_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504, 529})
+_CLAUDE_MAX_BACKOFF_SECONDS = 30.0
+
+
+# Error types Claude can send as an SSE event after the stream opened with 200
+_CLAUDE_STREAM_ERROR_STATUSES = {"overloaded_error": 529, "rate_limit_error": 429}
+
+
+def _claude_error_status(e: Exception) -> Optional[int]:
+    """
+    HTTP-equivalent status of a Claude API error. Mid-stream errors are raised
+    with the stream's own status (200), so the error body/message decides first.
+    """
+    body = getattr(e, "body", None)
+    error = body.get("error", body) if isinstance(body, dict) else None
+    if isinstance(error, dict) and error.get("type") in _CLAUDE_STREAM_ERROR_STATUSES:
+        return _CLAUDE_STREAM_ERROR_STATUSES[error["type"]]
+    status = getattr(e, "status_code", None)
+    if (status is None or status < 400) and "overloaded" in str(e).lower():
+        return 529
+    return status
+
+
+def _retry_after_seconds(e: Exception) -> Optional[float]:
+    response = getattr(e, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+async def _retry_claude(
+    make_call: Any, max_retries: int, admission: AdmissionController | None = None
+) -> Any:
+    """
+    Run a Claude call, retrying 429 / 5xx / 529 (overloaded) errors with
+    exponential backoff + jitter, or the server's retry-after when given.
+    With an admission controller, each attempt holds a slot and provider
+    push-back (429 / 529) shrinks the concurrency limit.
+    """
     for attempt in range(max_retries):
         try:
-            return await client.messages.create(**kwargs)
+            if admission is None:
+                return await make_call()
+            async with admission:
+                result = await make_call()
+            await admission.on_success()
+            return result
         except Exception as e:
-            if attempt < max_retries - 1 and ("529" in str(e) or "overloaded" in str(e).lower()):
-                wait = 2 ** attempt
-                logger.warning("Claude overloaded, retry %d/%d in %ds", attempt + 1, max_retries, wait)
+            status = _claude_error_status(e)
+            if admission is not None and status in (429, 529):
+                await admission.on_rate_limited()
+            if attempt < max_retries - 1 and status in _CLAUDE_RETRY_STATUSES:
+                backoff = min(_CLAUDE_MAX_BACKOFF_SECONDS, 2 ** attempt)
+                retry_after = _retry_after_seconds(e)
+                if retry_after:
+                    # Same cap as the jittered path — a bad header can't park the worker
+                    wait = max(0.0, min(retry_after, _CLAUDE_MAX_BACKOFF_SECONDS))
+                else:
+                    wait = backoff / 2 + random.uniform(0, backoff / 2)
+                logger.warning(
+                    "Claude error %s, retry %d/%d in %.1fs", status, attempt + 1, max_retries, wait,
+                )
                 await asyncio.sleep(wait)
                 continue
             raise
 
 
+def _cache_key(*parts: str) -> str:
+    """Deterministic cache key for a Claude call (sha256 of its inputs)."""
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+async def _cache_get(pool: Any, cache_key: str) -> Optional[dict[str, Any]]:
+    """Read a cached Claude response; cache errors are treated as a miss."""
+    try:
+        async with pool.acquire() as conn:
+            return await get_llm_cache(conn, cache_key)
+    except Exception as e:
+        logger.warning("LLM cache read failed: %s", e)
+        return None
+
+
+async def _cache_put(
+    pool: Any, cache_key: str, *, kind: str, response: dict[str, Any], model: str, ttl_days: int
+) -> None:
+    try:
+        async with pool.acquire() as conn:
+            await put_llm_cache(
+                conn, cache_key=cache_key, kind=kind, response=response, model=model, ttl_days=ttl_days,
+            )
+    except Exception as e:
+        logger.warning("LLM cache write failed: %s", e)
+
+
 def load_campaign_config(campaign: Optional[str] = None) -> dict[str, Any]:
     """Load campaign config by name from campaigns/ dir, or legacy campaign.json."""
     try:
@@ -140,6 +291,8 @@ def list_campaigns() -> list[str]:
 async def _search_target_orgs(
     config: dict[str, Any] | None = None,
     target_orgs: int = 200,
+    *,
+    http: httpx.AsyncClient,
 ) -> list[str]:
     """Step 1: Find target org domains via Apollo Organization Search.
 
@@ -161,23 +314,23 @@ async def _search_target_orgs(
         logger.warning("No apollo.organization_search config -- skipping org search")
         return []
 
-    logger.info("Apollo org search filters: %s", {k: v for k, v in os_config.items()})
+    logger.info("Apollo org search filters: %s", os_config)
 
     api_url = "https://api.apollo.io/api/v1/mixed_companies/search"
     headers = {"Content-Type": "application/json", "X-Api-Key": settings.apollo_api_key}
     nonprofit_tlds = (".org", ".org.uk", ".charity", ".ngo")
 
     # Probe page 1 to discover total_pages
-    async with httpx.AsyncClient(timeout=30) as client:
-        probe = await client.post(
-            api_url,
-            json={**os_config, "per_page": 100, "page": 1},
-            headers=headers,
-        )
-        probe.raise_for_status()
-        probe_data = probe.json()
-        total_pages = probe_data.get("pagination", {}).get("total_pages", 1)
-        total_entries = probe_data.get("pagination", {}).get("total_entries", 0)
+    probe = await http.post(
+        api_url,
+        json={**os_config, "per_page": 100, "page": 1},
+        headers=headers,
+        timeout=30,
+    )
+    probe.raise_for_status()
+    probe_data = orjson.loads(probe.content)
+    total_pages = probe_data.get("pagination", {}).get("total_pages", 1)
+    total_entries = probe_data.get("pagination", {}).get("total_entries", 0)
 
     logger.info(
         "Apollo org search: %d total orgs across %d pages", total_entries, total_pages
@@ -193,35 +346,34 @@ async def _search_target_orgs(
     domains: list[str] = []
     pages_fetched = 0
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        page = start_page
-        while len(domains) < target_orgs and pages_fetched < total_pages:
-            payload = {**os_config, "per_page": 100, "page": page}
-            try:
-                resp = await client.post(api_url, json=payload, headers=headers)
-                resp.raise_for_status()
-                data = resp.json()
-                orgs = data.get("organizations", []) or data.get("accounts", [])
-                if not orgs:
-                    break
-                logger.info("Apollo org search: page %d returned %d orgs", page, len(orgs))
-                for org in orgs:
-                    domain = org.get("primary_domain") or org.get("domain", "")
-                    name = org.get("name", "?")
-                    if not domain:
-                        continue
-                    if any(domain.endswith(tld) for tld in nonprofit_tlds):
-                        logger.info("  Skipped non-profit: %s (%s)", name, domain)
-                        continue
-                    domains.append(domain)
-                pages_fetched += 1
-                # Advance page, wrap around to 1 if we hit the end
-                page = page + 1 if page < total_pages else 1
-                if page == start_page:
-                    break  # wrapped all the way around
-            except Exception as e:
-                logger.error("Apollo org search failed on page %d: %s", page, e)
+    page = start_page
+    while len(domains) < target_orgs and pages_fetched < total_pages:
+        payload = {**os_config, "per_page": 100, "page": page}
+        try:
+            resp = await http.post(api_url, json=payload, headers=headers, timeout=30)
+            resp.raise_for_status()
+            data = orjson.loads(resp.content)
+            orgs = data.get("organizations", []) or data.get("accounts", [])
+            if not orgs:
                 break
+            logger.info("Apollo org search: page %d returned %d orgs", page, len(orgs))
+            for org in orgs:
+                domain = org.get("primary_domain") or org.get("domain", "")
+                name = org.get("name", "?")
+                if not domain:
+                    continue
+                if any(domain.endswith(tld) for tld in nonprofit_tlds):
+                    logger.info("  Skipped non-profit: %s (%s)", name, domain)
+                    continue
+                domains.append(domain)
+            pages_fetched += 1
+            # Advance page, wrap around to 1 if we hit the end
+            page = page + 1 if page < total_pages else 1
+            if page == start_page:
+                break  # wrapped all the way around
+        except Exception as e:
+            logger.error("Apollo org search failed on page %d: %s", page, e)
+            break
 
     logger.info(
         "Apollo org search: collected %d org domains (fetched %d pages, started at page %d)",
@@ -234,6 +386,8 @@ async def source_leads(
     config: dict[str, Any] | None = None,
     limit: int = 150,
     org_domains: list[str] | None = None,
+    *,
+    http: httpx.AsyncClient,
 ) -> list[dict[str, Any]]:
     """Step 2: Find people at target orgs via Apollo People API Search."""
     if not settings.apollo_api_key:
@@ -255,24 +409,25 @@ async def source_leads(
 
     logger.info("Apollo people search: %d org domains, limit %d", len(org_domains or []), limit)
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        try:
-            resp = await client.post(
-                "https://api.apollo.io/api/v1/mixed_people/api_search",
-                json=payload,
-                headers={"Content-Type": "application/json", "X-Api-Key": settings.apollo_api_key},
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            people = data.get("people", [])
-            logger.info("Apollo returned %d prospects", len(people))
-            return people
-        except Exception as e:
-            logger.error("Apollo sourcing failed: %s", e)
-            return []
+    try:
+        resp = await http.post(
+            "https://api.apollo.io/api/v1/mixed_people/api_search",
+            json=payload,
+            headers={"Content-Type": "application/json", "X-Api-Key": settings.apollo_api_key},
+        )
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+        people = data.get("people", [])
+        logger.info("Apollo returned %d prospects", len(people))
+        return people
+    except Exception as e:
+        logger.error("Apollo sourcing failed: %s", e)
+        return []
 
 
-async def _reveal_contacts(people: list[dict[str, Any]]) -> list[dict[str, Any]]:
+async def _reveal_contacts(
+    people: list[dict[str, Any]], *, http: httpx.AsyncClient
+) -> list[dict[str, Any]]:
     """Reveal masked contacts via Apollo bulk_match (batches of 10, 1 credit each)."""
     if not people or not settings.apollo_api_key:
         return []
@@ -284,28 +439,27 @@ async def _reveal_contacts(people: list[dict[str, Any]]) -> list[dict[str, Any]]
         if not details:
             continue
 
-        async with httpx.AsyncClient(timeout=20) as client:
-            try:
-                resp = await client.post(
-                    "https://api.apollo.io/api/v1/people/bulk_match",
-                    json={"details": details},
-                    headers={
-                        "Content-Type": "application/json",
-                        "X-Api-Key": settings.apollo_api_key,
-                    },
-                )
-                resp.raise_for_status()
-                data = resp.json()
-                matches = data.get("matches", [])
-                revealed.extend(matches)
-                logger.info(
-                    "Apollo reveal: %d/%d contacts revealed (batch %d)",
-                    len(matches),
-                    len(details),
-                    i // 10 + 1,
-                )
-            except Exception as e:
-                logger.error("Apollo reveal failed (batch %d): %s", i // 10 + 1, e)
+        try:
+            resp = await http.post(
+                "https://api.apollo.io/api/v1/people/bulk_match",
+                json={"details": details},
+                headers={
+                    "Content-Type": "application/json",
+                    "X-Api-Key": settings.apollo_api_key,
+                },
+            )
+            resp.raise_for_status()
+            data = orjson.loads(resp.content)
+            matches = data.get("matches", [])
+            revealed.extend(matches)
+            logger.info(
+                "Apollo reveal: %d/%d contacts revealed (batch %d)",
+                len(matches),
+                len(details),
+                i // 10 + 1,
+            )
+        except Exception as e:
+            logger.error("Apollo reveal failed (batch %d): %s", i // 10 + 1, e)
 
     logger.info("Apollo reveal total: %d contacts with full data", len(revealed))
     return revealed
@@ -351,62 +505,61 @@ def _normalise_company(name: str) -> str:
     return " ".join(name.split())
 
 
-async def _run_apify_job_search(term: str) -> list[dict[str, Any]]:
+async def _run_apify_job_search(term: str, *, http: httpx.AsyncClient) -> list[dict[str, Any]]:
     """Run one Apify LinkedIn Jobs search and return results."""
     if not settings.apify_api_key:
         return []
 
-    async with httpx.AsyncClient(timeout=20) as client:
-        try:
-            resp = await client.post(
-                f"https://api.apify.com/v2/acts/{_APIFY_ACTOR_ID}/runs",
-                params={"token": settings.apify_api_key, "memory": 256},
-                json={"searchKeyword": term, "location": "United Kingdom", "limit": 100},
-            )
-            resp.raise_for_status()
-            run_id = resp.json()["data"]["id"]
-            dataset_id = resp.json()["data"]["defaultDatasetId"]
-        except Exception as e:
-            logger.warning("Apify: failed to start run for '%s': %s", term, e)
-            return []
+    try:
+        resp = await http.post(
+            f"https://api.apify.com/v2/acts/{_APIFY_ACTOR_ID}/runs",
+            params={"token": settings.apify_api_key, "memory": 256},
+            json={"searchKeyword": term, "location": "United Kingdom", "limit": 100},
+        )
+        resp.raise_for_status()
+        run_data = resp.json()["data"]
+        run_id = run_data["id"]
+        dataset_id = run_data["defaultDatasetId"]
+    except Exception as e:
+        logger.warning("Apify: failed to start run for '%s': %s", term, e)
+        return []
 
     # Poll for completion
     deadline = asyncio.get_event_loop().time() + _APIFY_TIMEOUT
-    async with httpx.AsyncClient(timeout=10) as client:
-        while asyncio.get_event_loop().time() < deadline:
-            await asyncio.sleep(_APIFY_POLL_INTERVAL)
-            try:
-                status_resp = await client.get(
-                    f"https://api.apify.com/v2/acts/{_APIFY_ACTOR_ID}/runs/{run_id}",
-                    params={"token": settings.apify_api_key},
-                )
-                status = status_resp.json()["data"]["status"]
-                if status == "SUCCEEDED":
-                    break
-                if status in ("FAILED", "ABORTED", "TIMED-OUT"):
-                    logger.warning("Apify: run %s ended with status %s", run_id, status)
-                    return []
-            except Exception as e:
-                logger.warning("Apify: poll error for run %s: %s", run_id, e)
-                return []
-        else:
-            logger.warning("Apify: run %s timed out after %ds", run_id, _APIFY_TIMEOUT)
-            return []
-
-    # Fetch results
-    async with httpx.AsyncClient(timeout=15) as client:
+    while asyncio.get_event_loop().time() < deadline:
+        await asyncio.sleep(_APIFY_POLL_INTERVAL)
         try:
-            items_resp = await client.get(
-                f"https://api.apify.com/v2/datasets/{dataset_id}/items",
-                params={"token": settings.apify_api_key, "limit": 100},
+            status_resp = await http.get(
+                f"https://api.apify.com/v2/acts/{_APIFY_ACTOR_ID}/runs/{run_id}",
+                params={"token": settings.apify_api_key},
+                timeout=10,
             )
-            return items_resp.json() if items_resp.status_code == 200 else []
+            status = status_resp.json()["data"]["status"]
+            if status == "SUCCEEDED":
+                break
+            if status in ("FAILED", "ABORTED", "TIMED-OUT"):
+                logger.warning("Apify: run %s ended with status %s", run_id, status)
+                return []
         except Exception as e:
-            logger.warning("Apify: failed to fetch dataset %s: %s", dataset_id, e)
+            logger.warning("Apify: poll error for run %s: %s", run_id, e)
             return []
+    else:
+        logger.warning("Apify: run %s timed out after %ds", run_id, _APIFY_TIMEOUT)
+        return []
+
+    # Fetch results
+    try:
+        items_resp = await http.get(
+            f"https://api.apify.com/v2/datasets/{dataset_id}/items",
+            params={"token": settings.apify_api_key, "limit": 100},
+        )
+        return orjson.loads(items_resp.content) if items_resp.status_code == 200 else []
+    except Exception as e:
+        logger.warning("Apify: failed to fetch dataset %s: %s", dataset_id, e)
+        return []
 
 
-async def fetch_hiring_companies() -> dict[str, dict[str, str]]:
+async def fetch_hiring_companies(*, http: httpx.AsyncClient) -> dict[str, dict[str, str]]:
     """
     Batch-fetch UK companies currently hiring for sales roles via Apify.
     Runs once per pipeline invocation, in parallel with Apollo sourcing.
@@ -417,7 +570,7 @@ async def fetch_hiring_companies() -> dict[str, dict[str, str]]:
         return {}
 
     results = await asyncio.gather(
-        *[_run_apify_job_search(term) for term in _HIRING_SEARCH_TERMS],
+        *[_run_apify_job_search(term, http=http) for term in _HIRING_SEARCH_TERMS],
         return_exceptions=True,
     )
 
@@ -459,44 +612,163 @@ def _check_hiring_signal(
 # Enrichment — Website analysis (Claude)
 # ---------------------------------------------------------------------------
 
-async def _analyse_website(domain: str) -> dict[str, Any]:
+# Raw bytes read from a homepage; the page is then reduced to a digest of at
+# most _WEBSITE_DIGEST_CHARS for the prompt
+_WEBSITE_MAX_BYTES = 256 * 1024
+_WEBSITE_DIGEST_CHARS = 6000
+
+_INVISIBLE_TAGS = frozenset({"script", "style", "noscript", "svg", "template"})
+_SCRIPT_HOST_RE = re.compile(r"(?:https?:)?//([a-z0-9-]+(?:\.[a-z0-9-]+)+)", re.IGNORECASE)
+
+
+class _PageDigest(HTMLParser):
+    """
+    Reduce homepage HTML to what the website analysis needs: title, meta
+    tags, third-party script/iframe sources (CRM / tool detection), linked
+    hosts and visible text. Style, SVG and script bodies are dropped.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.title: list[str] = []
+        self.meta: list[str] = []
+        self.scripts: dict[str, None] = {}
+        self.links: dict[str, None] = {}
+        self.text: list[str] = []
+        self._skip = 0
+        self._in_title = False
+        self._in_script = False
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        a = dict(attrs)
+        if tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            name = a.get("name") or a.get("property")
+            if name and a.get("content") and name.lower() in (
+                "description", "keywords", "generator", "og:title", "og:description",
+            ):
+                self.meta.append(f"{name}={a['content'].strip()}")
+        elif tag in ("script", "iframe") and a.get("src"):
+            self.scripts[a["src"]] = None
+        elif tag == "a" and (a.get("href") or "").startswith(("http://", "https://", "//")):
+            host = _SCRIPT_HOST_RE.match(a["href"])
+            if host:
+                self.links[host.group(1).lower()] = None
+        if tag == "script":
+            self._in_script = True
+        if tag in _INVISIBLE_TAGS:
+            self._skip += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self._in_title = False
+        if tag == "script":
+            self._in_script = False
+        if tag in _INVISIBLE_TAGS and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title.append(data)
+        elif self._in_script:
+            # Inline loaders still name their host (e.g. js.hs-scripts.com)
+            for m in _SCRIPT_HOST_RE.finditer(data):
+                self.scripts[m.group(1).lower()] = None
+        elif not self._skip:
+            self.text.append(data)
+
+
+def _digest_html(html: str) -> str:
+    """Turn raw homepage HTML into a compact text digest for the prompt."""
+    parser = _PageDigest()
+    try:
+        parser.feed(html)
+        parser.close()
+    except AssertionError:
+        pass  # html.parser's only hard failure (bad marked section) — keep whatever was parsed
+    parts = []
+    title = " ".join(" ".join(parser.title).split())
+    if title:
+        parts.append(f"TITLE: {title}")
+    if parser.meta:
+        parts.append("META: " + "; ".join(parser.meta))
+    if parser.scripts:
+        parts.append("SCRIPTS: " + ", ".join(list(parser.scripts)[:40]))
+    if parser.links:
+        parts.append("LINKED HOSTS: " + ", ".join(list(parser.links)[:40]))
+    parts.append("TEXT: " + " ".join(" ".join(parser.text).split()))
+    return "\n".join(parts)[:_WEBSITE_DIGEST_CHARS]
+
+
+async def _analyse_website(
+    domain: str,
+    *,
+    http: httpx.AsyncClient,
+    claude: AsyncAnthropic,
+    pool: Any,
+    admission: AdmissionController | None = None,
+) -> dict[str, Any]:
     """Fetch company homepage and extract signals using Claude Haiku."""
     if not domain or not settings.anthropic_api_key:
         return {}
 
+    # Same domain → same analysis; cached per domain + model + prompt version
+    cache_key = _cache_key("website", domain.lower(), ENRICHMENT_MODEL, WEBSITE_PROMPT_VERSION)
+    cached = await _cache_get(pool, cache_key)
+    if cached is not None:
+        return cached
+
     url = f"https://{domain}"
-    html = ""
+    page = ""
     try:
-        async with httpx.AsyncClient(timeout=10, follow_redirects=True) as client:
-            resp = await client.get(url, headers={"User-Agent": "Mozilla/5.0"})
-            html = resp.text[:6000]
+        # Stream and stop once we have enough — marketing pages can be megabytes
+        body = bytearray()
+        async with http.stream(
+            "GET", url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10, follow_redirects=True,
+        ) as resp:
+            async for chunk in resp.aiter_bytes():
+                body += chunk
+                if len(body) >= _WEBSITE_MAX_BYTES:
+                    break
+            html = body[:_WEBSITE_MAX_BYTES].decode(resp.encoding or "utf-8", errors="replace")
+        # Strip markup off the event loop so only signal-bearing text is sent
+        page = await asyncio.to_thread(_digest_html, html)
     except Exception as e:
         logger.warning("Website fetch failed for %s: %s", domain, e)
         return {}
 
-    client = AsyncAnthropic(api_key=settings.anthropic_api_key)
     try:
-        msg = await _call_claude_with_retry(
-            client,
+        text = await _stream_claude_json(
+            claude,
+            admission=admission,
             model=ENRICHMENT_MODEL,
             max_tokens=400,
             messages=[{
                 "role": "user",
                 "content": (
-                    f"Analyse this website HTML and return JSON with these fields:\n"
+                    f"Analyse this website digest (title, meta tags, script sources, linked hosts "
+                    f"and visible text of the homepage) and return JSON with these fields:\n"
                     f"- has_booking_flow: boolean (is there a book demo/call/meeting CTA?)\n"
                     f"- crm_detected: string or null (HubSpot, Salesforce etc based on scripts)\n"
                     f"- tech_stack: list of strings (detected tools)\n"
                     f"- growth_language: boolean (scaling, growth, expansion language?)\n\n"
-                    f"HTML: {html}\n\nReturn ONLY valid JSON, no explanation."
+                    f"{page}\n\nReturn ONLY valid JSON, no explanation."
                 ),
             }],
         )
-        return json.loads(_extract_json(msg.content[0].text))
+        result = orjson.loads(_extract_json(text))
     except Exception as e:
         logger.warning("Website analysis failed for %s: %s", domain, e)
         return {}
 
+    if result:
+        await _cache_put(
+            pool, cache_key, kind="website", response=result,
+            model=ENRICHMENT_MODEL, ttl_days=WEBSITE_CACHE_TTL_DAYS,
+        )
+    return result
+
 
 # ---------------------------------------------------------------------------
 # Personalisation — Claude
@@ -518,10 +790,11 @@ async def _generate_personalisation(
     lead: dict[str, Any],
     signals: dict[str, Any],
     config: dict[str, Any] | None = None,
+    *,
+    claude: AsyncAnthropic,
+    admission: AdmissionController | None = None,
 ) -> dict[str, Any]:
     """Run Claude personalisation engine. Returns structured output dict."""
-    client = AsyncAnthropic(api_key=settings.anthropic_api_key)
-
     p_config = (config or {}).get("personalisation", {})
     template_ctx = p_config.get("template_context", TEMPLATE_CONTEXT)
 
@@ -543,7 +816,7 @@ Prospect:
 - Domain: {lead.get('company_domain', '')}
 
 Available signals (use ONLY what is here — never invent):
-{json.dumps(signals, indent=2)}
+{orjson.dumps(signals, option=orjson.OPT_INDENT_2).decode()}
 
 Rung system (choose highest achievable):
 - Rung 5: Specific + evidence-backed (cite real signal with source_url)
@@ -592,26 +865,216 @@ Truth rules — non-negotiable:
     }
 
     try:
-        msg = await _call_claude_with_retry(
-            client,
+        text = await _stream_claude_json(
+            claude,
+            admission=admission,
             model=PERSONALISATION_MODEL,
             max_tokens=500,
             messages=[{"role": "user", "content": prompt}],
         )
-        result = json.loads(_extract_json(msg.content[0].text))
+        result = orjson.loads(_extract_json(text))
         result.setdefault("evidence_used", [])
         result.setdefault("risk_flags", [])
         result.setdefault("rung", 1)
-        return result
     except Exception as e:
         logger.warning("Personalisation failed for %s: %s", lead.get("email"), e)
         return fallback
 
+    return result
+
 
 # ---------------------------------------------------------------------------
 # Main pipeline entry point
 # ---------------------------------------------------------------------------
 
+async def _import_leads(
+    conn: Any,
+    prospects: list[dict[str, Any]],
+    *,
+    stats: dict[str, Any],
+    today: date,
+    config: dict[str, Any],
+    lead_target: int,
+    seen_companies: set[str],
+) -> list[tuple[str, dict[str, Any]]]:
+    """
+    Suppress, dedup and bulk-insert prospects until lead_target is reached.
+
+    Suppression is checked against the cached block list; inserts go in
+    rounds sized to the remaining target (emails that already exist come back
+    missing and are counted as duplicates). Returns [(lead_id, lead)] in
+    prospect order.
+    """
+    leads = [_parse_apollo_person(person) for person in prospects]
+    supp_emails, supp_domains = await get_suppression_sets(conn)
+
+    imported: list[tuple[str, dict[str, Any]]] = []
+    seen_emails: set[str] = set()
+    pos = 0
+    while len(imported) < lead_target and pos < len(leads):
+        need = lead_target - len(imported)
+        batch: list[dict[str, Any]] = []
+        while len(batch) < need and pos < len(leads):
+            lead = leads[pos]
+            pos += 1
+            domain = lead.get("company_domain")
+            company_key = domain or _normalise_company(lead.get("company", ""))
+
+            # One contact per company — skip if we already have someone there
+            if company_key:
+                if company_key in seen_companies:
+                    logger.info("Skipping %s — already have contact at %s", lead["email"], company_key)
+                    stats["skipped_duplicate"] += 1
+                    continue
+                seen_companies.add(company_key)
+
+            if lead["email"] in supp_emails or (domain and domain in supp_domains):
+                stats["skipped_suppressed"] += 1
+                continue
+
+            if lead["email"] in seen_emails:
+                stats["skipped_duplicate"] += 1
+                continue
+            seen_emails.add(lead["email"])
+            batch.append(lead)
+
+        # Insert batch (emails that already exist are skipped)
+        lead_ids = await insert_leads_returning(
+            conn, batch, batch_date=today, campaign_name=config.get("campaign_name"),
+        )
+        for lead in batch:
+            lead_id = lead_ids.get(lead["email"])
+            if lead_id:
+                imported.append((lead_id, lead))
+            else:
+                stats["skipped_duplicate"] += 1
+
+    if len(imported) >= lead_target and pos < len(leads):
+        logger.info("Hit target of %d leads — stopping", lead_target)
+
+    await log_events_bulk(conn, [(lead_id, "imported", None) for lead_id, _ in imported])
+    return imported
+
+
+async def _process_prospect(
+    lead_id: str,
+    lead: dict[str, Any],
+    *,
+    pool: Any,
+    stats: dict[str, Any],
+    config: dict[str, Any],
+    hiring_companies: dict[str, dict[str, str]],
+    http: httpx.AsyncClient,
+    claude: AsyncAnthropic,
+    admission: AdmissionController,
+) -> None:
+    """Enrich → personalise → store a single imported lead."""
+    domain = lead.get("company_domain")
+
+    # --- Enrichment (outside transaction — slow network calls) ---
+    signals: dict[str, Any] = {}
+
+    hiring_signal = _check_hiring_signal(lead.get("company", ""), hiring_companies)
+    signals.update(hiring_signal)
+
+    if domain:
+        website_signals = await _analyse_website(
+            domain, http=http, claude=claude, pool=pool, admission=admission,
+        )
+        if website_signals:
+            signals["website"] = website_signals
+
+    # --- Personalisation ---
+    p = await _generate_personalisation(
+        lead, signals, config=config, claude=claude, admission=admission,
+    )
+    review_status = _determine_review_status(p)
+
+    # Enrichment + personalisation writes share one connection and commit together.
+    # Finishing the claim first locks the row and checks this worker still owns it
+    # (a stale claim may have been reclaimed and finished by another run).
+    async with pool.acquire() as conn, conn.transaction():
+        if not await mark_lead_personalised(conn, lead_id):
+            logger.warning("Pipeline: lead %s was reclaimed by another worker, skipping", lead.get("email"))
+            return
+        await insert_enrichment(conn, lead_id=lead_id, signals=signals)
+        await insert_personalisation(
+            conn,
+            lead_id=lead_id,
+            opener_first_line=_sanitize_text(p.get("opener_first_line", "")),
+            micro_insight=p.get("micro_insight"),
+            angle_tag=p.get("angle_tag"),
+            confidence_score=float(p.get("confidence_score", 0.0)),
+            evidence_used=p.get("evidence_used", []),
+            risk_flags=p.get("risk_flags", []),
+            rung=int(p.get("rung", 1)),
+            review_status=review_status,
+            prompt_version=PROMPT_VERSION,
+            model=PERSONALISATION_MODEL,
+        )
+        # Both events in one executemany, inside the same transaction
+        await log_events_bulk(conn, [
+            (lead_id, "enriched", None),
+            (lead_id, "personalised", {
+                "review_status": review_status, "rung": p.get("rung"), "confidence": p.get("confidence_score"),
+            }),
+        ])
+
+    stats["enriched"] += 1
+    stats[review_status] += 1
+
+
+async def _pipeline_worker(
+    *,
+    pool: Any,
+    stats: dict[str, Any],
+    today: date,
+    config: dict[str, Any],
+    hiring_companies: dict[str, dict[str, str]],
+    http: httpx.AsyncClient,
+    claude: AsyncAnthropic,
+    admission: AdmissionController,
+) -> None:
+    """Claim and process leads for this batch + campaign until none are left."""
+    while True:
+        async with pool.acquire() as conn:
+            row = await claim_next_lead(
+                conn,
+                batch_date=today,
+                campaign_name=config.get("campaign_name"),
+                stale_after_seconds=PROCESSING_STALE_SECONDS,
+            )
+        if row is None:
+            return
+
+        lead = dict(row)
+        lead_id = lead.pop("lead_id")
+        try:
+            await _process_prospect(
+                lead_id,
+                lead,
+                pool=pool,
+                stats=stats,
+                config=config,
+                hiring_companies=hiring_companies,
+                http=http,
+                claude=claude,
+                admission=admission,
+            )
+        except Exception as e:
+            stats["errors"] += 1
+            logger.error("Pipeline: lead %s failed: %s", lead["email"], e)
+            # Don't leave it 'processing' — retrying in this run would likely fail again
+            try:
+                async with pool.acquire() as conn, conn.transaction():
+                    if await release_failed_lead(conn, lead_id):
+                        await log_event(
+                            conn, lead_id=lead_id, event_type="pipeline_failed", meta={"error": str(e)[:500]},
+                        )
+            except Exception as release_error:
+                logger.error("Pipeline: could not release lead %s: %s", lead["email"], release_error)
+
+
 async def run_pipeline(batch_date: Optional[date] = None, campaign: Optional[str] = None) -> dict[str, Any]:
     """
     Full pipeline: source → enrich → personalise → store.
@@ -635,17 +1098,43 @@ async def run_pipeline(batch_date: Optional[date] = None, campaign: Optional[str
         "errors": 0,
     }
 
+    # One HTTP connection pool + one Anthropic client for the whole run, so
+    # TLS sessions and keep-alive connections are reused across calls.
+    async with httpx.AsyncClient(
+        timeout=20,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+    ) as http, AsyncAnthropic(api_key=settings.anthropic_api_key) as claude:
+        # Hiring signals don't depend on Apollo — fetch them in the background
+        # while orgs are searched and contacts are sourced + revealed.
+        hiring_task = asyncio.create_task(fetch_hiring_companies(http=http))
+        try:
+            return await _run_pipeline_stages(
+                config, today, lead_target, lead_limit, stats, hiring_task, http, claude,
+            )
+        finally:
+            if not hiring_task.done():
+                hiring_task.cancel()
+                await asyncio.gather(hiring_task, return_exceptions=True)
+
+
+async def _run_pipeline_stages(
+    config: dict[str, Any],
+    today: date,
+    lead_target: int,
+    lead_limit: int,
+    stats: dict[str, Any],
+    hiring_task: asyncio.Task,
+    http: httpx.AsyncClient,
+    claude: AsyncAnthropic,
+) -> dict[str, Any]:
     # Step 1: Find target orgs by keyword (debt management etc.)
-    org_domains = await _search_target_orgs(config)
+    org_domains = await _search_target_orgs(config, http=http)
     if not org_domains:
         logger.warning("Pipeline: no target orgs found — check campaign.json organization_search config")
         return stats
 
-    # Step 2: Find people at those orgs + fetch hiring signals concurrently
-    search_results, hiring_companies = await asyncio.gather(
-        source_leads(config=config, limit=lead_limit, org_domains=org_domains),
-        fetch_hiring_companies(),
-    )
+    # Step 2: Find people at those orgs
+    search_results = await source_leads(config=config, limit=lead_limit, org_domains=org_domains, http=http)
     stats["sourced"] = len(search_results)
 
     if not search_results:
@@ -659,7 +1148,7 @@ async def run_pipeline(batch_date: Optional[date] = None, campaign: Optional[str
         return stats
 
     # Step 3: Reveal full contact details (email, last name, linkedin, domain)
-    prospects = await _reveal_contacts(search_results)
+    prospects = await _reveal_contacts(search_results, http=http)
 
     if not prospects:
         logger.warning("Pipeline: no contacts revealed")
@@ -672,6 +1161,7 @@ async def run_pipeline(batch_date: Optional[date] = None, campaign: Optional[str
     if dropped:
         logger.info("Dropped %d prospects with no email after reveal", dropped)
 
+    hiring_companies = await hiring_task
     pool = await get_pool()
 
     # Pre-load existing company domains from DB for cross-run dedup
@@ -682,94 +1172,38 @@ async def run_pipeline(batch_date: Optional[date] = None, campaign: Optional[str
     seen_companies: set[str] = {r["company_domain"] for r in existing}
     logger.info("Pre-loaded %d existing company domains for dedup", len(seen_companies))
 
-    for person in prospects:
-        # Stop once we've hit the target
-        if stats["enriched"] >= lead_target:
-            logger.info("Hit target of %d leads — stopping", lead_target)
-            break
-
-        lead = _parse_apollo_person(person)
-
-        domain = lead.get("company_domain")
-        company_key = domain or _normalise_company(lead.get("company", ""))
-
-        # One contact per company — skip if we already have someone there
-        if company_key:
-            if company_key in seen_companies:
-                logger.info("Skipping %s — already have contact at %s", lead["email"], company_key)
-                stats["skipped_duplicate"] += 1
-                continue
-            seen_companies.add(company_key)
-
-        async with pool.acquire() as conn:
-            # Suppression check
-            if await is_suppressed(conn, lead["email"], domain):
-                stats["skipped_suppressed"] += 1
-                continue
-
-            # Insert lead (skip if email already exists)
-            lead_id = await insert_lead(
-                conn,
-                batch_date=today,
-                campaign_name=config.get("campaign_name"),
-                **{k: lead[k] for k in lead},
-            )
-            if not lead_id:
-                stats["skipped_duplicate"] += 1
-                continue
-
-            await log_event(conn, lead_id=lead_id, event_type="imported")
-
-        # --- Enrichment (outside transaction — slow network calls) ---
-        signals: dict[str, Any] = {}
-
-        hiring_signal = _check_hiring_signal(lead.get("company", ""), hiring_companies)
-        signals.update(hiring_signal)
-
-        if domain:
-            website_signals = await _analyse_website(domain)
-            if website_signals:
-                signals["website"] = website_signals
-
-        async with pool.acquire() as conn:
-            await insert_enrichment(conn, lead_id=lead_id, signals=signals)
-            await log_event(conn, lead_id=lead_id, event_type="enriched")
-            stats["enriched"] += 1
-
-        # --- Personalisation ---
-        p = await _generate_personalisation(lead, signals, config=config)
-        review_status = _determine_review_status(p)
-
-        async with pool.acquire() as conn:
-            await insert_personalisation(
-                conn,
-                lead_id=lead_id,
-                opener_first_line=_sanitize_text(p.get("opener_first_line", "")),
-                micro_insight=p.get("micro_insight"),
-                angle_tag=p.get("angle_tag"),
-                confidence_score=float(p.get("confidence_score", 0.0)),
-                evidence_used=p.get("evidence_used", []),
-                risk_flags=p.get("risk_flags", []),
-                rung=int(p.get("rung", 1)),
-                review_status=review_status,
-                prompt_version=PROMPT_VERSION,
-                model=PERSONALISATION_MODEL,
-            )
-            await conn.execute(
-                "UPDATE outreach.leads SET status = 'personalised', updated_at = now() WHERE lead_id = $1::uuid",
-                lead_id,
-            )
-            await log_event(
-                conn,
-                lead_id=lead_id,
-                event_type="personalised",
-                meta={"review_status": review_status, "rung": p.get("rung"), "confidence": p.get("confidence_score")},
-            )
-
-        stats[review_status] += 1
+    # Import: suppression, dedup and inserts in bulk on one connection
+    async with pool.acquire() as conn, conn.transaction():
+        imported = await _import_leads(
+            conn,
+            prospects,
+            stats=stats,
+            today=today,
+            config=config,
+            lead_target=lead_target,
+            seen_companies=seen_companies,
+        )
 
-        # Pace API calls to avoid Claude rate limits
-        await asyncio.sleep(1)
+    logger.info("Imported %d leads", len(imported))
+
+    # Enrich + personalise: K workers claim this batch's leads from the table
+    # (FOR UPDATE SKIP LOCKED), so concurrent runs share the work and leads
+    # left 'processing' by a crashed run are picked up again once stale.
+    # Claude calls get their own adaptive limit, shrunk on 429 / 529.
+    admission = AdmissionController(settings.claude_concurrency)
+    await asyncio.gather(*(
+        _pipeline_worker(
+            pool=pool,
+            stats=stats,
+            today=today,
+            config=config,
+            hiring_companies=hiring_companies,
+            http=http,
+            claude=claude,
+            admission=admission,
+        )
+        for _ in range(settings.pipeline_concurrency)
+    ))
 
     logger.info("Pipeline complete: %s", stats)
     return stats
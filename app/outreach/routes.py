@@ -7,6 +7,7 @@ from decimal import Decimal
 from typing import Optional
 
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
@@ -34,13 +35,14 @@ async def review_page(request: Request, batch_date: Optional[str] = None):
     today = date.fromisoformat(batch_date) if batch_date else date.today()
     pool = await get_pool()
     async with pool.acquire() as conn:
-        leads = await models.get_batch(conn, today)
-        counts = await models.get_batch_counts(conn, today)
+        leads, counts = await models.get_batch_with_counts(conn, today)
 
+    # Rows arrive ordered needs_review → auto_send → blocked (see GET_BATCH_WITH_COUNTS_SQL),
+    # so the displayed sections are a prefix of the result
     all_leads = []
     for l in leads:
         if l["review_status"] not in ("needs_review", "auto_send"):
-            continue
+            break
         row = dict(l)
         for k, v in row.items():
             if isinstance(v, Decimal):
@@ -49,7 +51,9 @@ async def review_page(request: Request, batch_date: Optional[str] = None):
 
     batch_sent = counts.get("sent", 0) > 0
 
-    return templates.TemplateResponse("review.html", {
+    # Render in a worker thread — a full batch is a large template and
+    # Jinja rendering would otherwise block the event loop
+    return await run_in_threadpool(templates.TemplateResponse, "review.html", {
         "request": request,
         "batch_date": today.strftime("%d %b %Y").lstrip("0"),
         "batch_date_iso": today.isoformat(),
@@ -177,7 +181,7 @@ async def send_batch(batch_date: Optional[str] = None):
         return {"ok": True, "sent": 0, "failed": 0, "message": "No sendable leads for this date"}
 
     # Group leads by campaign and send to the correct Instantly campaign
-    by_campaign: dict[str, list[dict]] = {}
+    by_campaign: dict[str, list] = {}
     for lead in leads:
         cname = lead.get("campaign_name") or "default"
         by_campaign.setdefault(cname, []).append(lead)
@@ -189,14 +193,15 @@ async def send_batch(batch_date: Optional[str] = None):
         campaign_id = config.get("instantly_campaign_id")
         result = await push_to_instantly(campaign_leads, campaign_id=campaign_id)
 
-        async with pool.acquire() as conn:
-            for lead in campaign_leads:
-                if result["failed"] == 0:
-                    await models.mark_lead_sent(conn, lead["lead_id"])
-                    await models.log_event(conn, lead_id=lead["lead_id"], event_type="sent")
-                else:
-                    await models.mark_lead_failed(conn, lead["lead_id"])
-                    await models.log_event(conn, lead_id=lead["lead_id"], event_type="failed")
+        # Whole campaign is marked sent or failed together — two statements, not 2×N
+        lead_ids = [lead["lead_id"] for lead in campaign_leads]
+        async with pool.acquire() as conn, conn.transaction():
+            if result["failed"] == 0:
+                await models.mark_leads_sent(conn, lead_ids)
+                await models.log_events_for_leads(conn, lead_ids, "sent")
+            else:
+                await models.mark_leads_failed(conn, lead_ids)
+                await models.log_events_for_leads(conn, lead_ids, "failed")
 
         total_sent += result.get("sent", 0)
         total_failed += result.get("failed", 0)
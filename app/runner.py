@@ -19,6 +19,7 @@ from datetime import datetime
 
 from app.config import settings
 from app.db import init_db_pool, close_db_pool, get_pool
+from app.adapters.calendar.ghl import close_http_client as close_ghl_calendar_client
 from app.bot.jobs import claim_jobs, mark_done, mark_retry
 from app.bot.processor import process_job
 from app.bot.sender import send_pending_outbound
@@ -222,6 +223,7 @@ async def main() -> None:
             monitor_loop(),
         )
     finally:
+        await close_ghl_calendar_client()
         logger.info("Closing database pool...")
         await close_db_pool()
         logger.info("Worker runner stopped")
@@ -6,10 +6,11 @@ Encryption key must be set via TENANT_ENCRYPTION_KEY env var.
 """
 from __future__ import annotations
 
-import json
+import functools
 import os
 from typing import Any
 
+import orjson
 from cryptography.fernet import Fernet, InvalidToken
 
 
@@ -18,6 +19,12 @@ def _get_fernet() -> Fernet:
     key = os.getenv("TENANT_ENCRYPTION_KEY")
     if not key:
         raise RuntimeError("TENANT_ENCRYPTION_KEY not set in environment")
+    return _fernet_for_key(key)
+
+
+@functools.lru_cache(maxsize=1)
+def _fernet_for_key(key: str) -> Fernet:
+    """Build the Fernet instance once per key value (keyed so a rotated env key is picked up)."""
     return Fernet(key.encode())
 
 
@@ -32,8 +39,7 @@ def encrypt_credentials(data: dict[str, Any]) -> bytes:
         Encrypted bytes suitable for storing in BYTEA column.
     """
     f = _get_fernet()
-    json_bytes = json.dumps(data).encode("utf-8")
-    return f.encrypt(json_bytes)
+    return f.encrypt(orjson.dumps(data))
 
 
 def decrypt_credentials(encrypted: bytes) -> dict[str, Any]:
@@ -50,8 +56,7 @@ def decrypt_credentials(encrypted: bytes) -> dict[str, Any]:
         InvalidToken: If decryption fails (wrong key or corrupted data).
     """
     f = _get_fernet()
-    decrypted = f.decrypt(encrypted)
-    return json.loads(decrypted.decode("utf-8"))
+    return orjson.loads(f.decrypt(encrypted))
 
 
 def generate_key() -> str:
@@ -0,0 +1,16 @@
+-- 005_outreach_batch_indexes.sql
+-- Index for the review-UI batch query (app/outreach/models.py: GET_BATCH_WITH_COUNTS_SQL).
+-- The query filters on leads.batch_date, so the ORDER BY (on personalisation
+-- columns) is still a Sort over the day's rows; this only serves the leads side.
+
+-- Covering index for the leads side of the batch join: every leads column
+-- GET_BATCH_WITH_COUNTS_SQL selects is in INCLUDE, so the batch_date filter
+-- can be an index-only scan. Also serves the other batch_date filter
+-- (sendable leads), so it replaces idx_outreach_leads_batch_date from 003.
+CREATE INDEX IF NOT EXISTS idx_outreach_leads_batch_cover ON outreach.leads (batch_date)
+    INCLUDE (
+        lead_id, first_name, last_name, email, title,
+        company, company_domain, campaign_name, status
+    );
+
+DROP INDEX IF EXISTS outreach.idx_outreach_leads_batch_date;
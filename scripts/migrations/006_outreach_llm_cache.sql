@@ -0,0 +1,18 @@
+-- 006_outreach_llm_cache.sql
+-- Exact-match cache for Claude responses in the outreach pipeline
+-- (app/outreach/pipeline.py: _analyse_website). Personalisation is not
+-- cached — the opener names the lead's company, so it never repeats.
+-- cache_key is a sha256 of the call inputs + model + WEBSITE_PROMPT_VERSION,
+-- so a model or prompt bump naturally misses. Expired rows are ignored on read.
+
+CREATE TABLE IF NOT EXISTS outreach.llm_cache (
+    cache_key       TEXT PRIMARY KEY,
+    kind            TEXT NOT NULL,
+    -- which pipeline call the row caches (currently only 'website')
+    response        JSONB NOT NULL,
+    model           TEXT,
+    created_at      TIMESTAMPTZ NOT NULL DEFAULT now(),
+    expires_at      TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_outreach_llm_cache_expires ON outreach.llm_cache (expires_at);
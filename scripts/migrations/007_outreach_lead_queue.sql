@@ -0,0 +1,8 @@
+-- 007_outreach_lead_queue.sql
+-- Supports the pipeline work queue (app/outreach/models.py: CLAIM_NEXT_LEAD_SQL).
+-- Workers claim leads with FOR UPDATE SKIP LOCKED, moving status
+-- new -> processing -> personalised (or pipeline_failed). Only unfinished leads
+-- are indexed.
+
+CREATE INDEX IF NOT EXISTS idx_outreach_leads_queue ON outreach.leads (batch_date, campaign_name, created_at)
+    WHERE status IN ('new', 'processing');
@@ -0,0 +1,16 @@
+-- 008_outreach_personalisation_unique_lead.sql
+-- One personalisation per lead (app/outreach/models.py: INSERT_PERSONALISATION_SQL
+-- inserts with ON CONFLICT (lead_id) DO NOTHING). Without this, two workers
+-- finishing the same reclaimed lead could both insert, and the lead would be
+-- returned — and sent — twice by GET_SENDABLE_LEADS_SQL.
+
+-- Drop duplicates left by that race, keeping each lead's earliest row.
+DELETE FROM outreach.personalisation p
+USING outreach.personalisation keep
+WHERE p.lead_id = keep.lead_id
+  AND (p.created_at, p.personalisation_id) > (keep.created_at, keep.personalisation_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_outreach_pers_lead ON outreach.personalisation (lead_id);
+
+-- Superseded by the unique index on the same column
+DROP INDEX IF EXISTS outreach.idx_outreach_pers_lead;
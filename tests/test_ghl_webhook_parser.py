@@ -1,34 +1,203 @@
 from __future__ import annotations
 
+import json
+import sys
 import unittest
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+
+from app.engine.providers.ghl_webhook_parser import (
+    _validated_tenant,
+    parse_ghl_webhook,
+    parse_ghl_webhook_bytes,
+    parse_ghl_webhooks,
+)
+
+# Canonical stage-update payload; tests take a dict() copy to build variants
+_BASE_PAYLOAD = MappingProxyType({
+    "tenant_id": "11111111-1111-1111-1111-111111111111",
+    "locationId": "loc-123",
+    "opportunityId": "opp-1",
+    "contactId": "contact-1",
+    "stage": "Proposal Sent",
+    "type": "OpportunityStageUpdate",
+    "eventId": "evt-123",
+    "occurredAt": "2026-02-15T10:00:00Z",
+    "monetaryValue": "2500.50",
+})
+
+# Expected value for an unparseable occurredAt: the parser falls back to now()
+_NOW = object()
+
+# (payload overrides, result field, expected value) on top of _BASE_PAYLOAD
+_CONTRACT_CASES = (
+    ({}, "provider", "ghl"),
+    ({}, "tenant_id", "11111111-1111-1111-1111-111111111111"),
+    ({}, "lead_external_id", "opp-1"),
+    ({}, "contact_external_id", "contact-1"),
+    ({}, "raw_stage", "Proposal Sent"),
+    ({}, "event_type", "stage_changed"),
+    ({}, "source_event_id", "evt-123"),
+    ({}, "lead_value", 2500.5),
+    ({}, "location_id", "loc-123"),
+    ({}, "occurred_at", datetime(2026, 2, 15, 10, 0, 0, tzinfo=timezone.utc)),
+    # Canonical length but wrong separators / non-digit fields — not a timestamp
+    ({"occurredAt": "2026/02/15T10:00:00Z"}, "occurred_at", _NOW),
+    ({"occurredAt": "2026-02-15T10-00-00Z"}, "occurred_at", _NOW),
+    ({"occurredAt": "2026-02-15T+1:00:00Z"}, "occurred_at", _NOW),
+    ({"occurredAt": "2026-02-15T 1:00:00Z"}, "occurred_at", _NOW),
+    ({"occurredAt": "2026-02-15T\uff110:00:00Z"}, "occurred_at", _NOW),
+)
+
+# GHL webhook type strings seen in production and how they classify
+_KNOWN_EVENT_TYPES = (
+    ("OpportunityCreate", "lead_created"),
+    ("OpportunityUpdate", "lead_created"),
+    ("OpportunityStageUpdate", "stage_changed"),
+    ("OpportunityStatusUpdate", "stage_changed"),
+    ("OpportunityMonetaryValueUpdate", "lead_created"),
+    ("OpportunityAssignedToUpdate", "lead_created"),
+    ("ContactCreate", "lead_created"),
+    ("ContactUpdate", "lead_created"),
+    ("PipelineStageUpdate", "stage_changed"),
+)
 
-from app.engine.providers.ghl_webhook_parser import parse_ghl_webhook
 
 
 class GHLWebhookParserTests(unittest.TestCase):
     def test_parser_extracts_normalized_contract_fields(self):
+        for overrides, field, expected in _CONTRACT_CASES:
+            with self.subTest(field=field, **overrides):
+                payload = dict(_BASE_PAYLOAD)
+                payload["garbage"] = "x"
+                payload.update(overrides)
+                before = datetime.now(tz=timezone.utc)
+                result = parse_ghl_webhook(payload)
+                after = datetime.now(tz=timezone.utc)
+
+                value = getattr(result, field)
+                if expected is _NOW:
+                    self.assertTrue(before <= value <= after, value)
+                else:
+                    self.assertEqual(value, expected)
+                # Slotted result — no per-event __dict__
+                self.assertFalse(hasattr(result, "__dict__"))
+
+    def test_parser_from_raw_json_bytes(self):
+        payload = dict(_BASE_PAYLOAD)
+        result = parse_ghl_webhook_bytes(json.dumps(payload).encode())
+
+        self.assertEqual(result, parse_ghl_webhook(payload))
+        with self.assertRaises(ValueError):
+            parse_ghl_webhook_bytes(b"[]")
+
+    def test_base_payload_is_immutable(self):
+        with self.assertRaises(TypeError):
+            _BASE_PAYLOAD["x"] = 1
+
+    def test_known_event_types_are_classified(self):
+        for raw_type, expected in _KNOWN_EVENT_TYPES:
+            with self.subTest(type=raw_type):
+                # No stage in the payload, so the type alone decides
+                result = parse_ghl_webhook({"opportunityId": "opp-1", "type": raw_type})
+                self.assertEqual(result.event_type, expected)
+
+    def test_tenant_id_validation_is_cached(self):
         payload = {
-            "tenant_id": "11111111-1111-1111-1111-111111111111",
-            "locationId": "loc-123",
+            "tenant_id": "22222222-2222-2222-2222-222222222222",
             "opportunityId": "opp-1",
-            "contactId": "contact-1",
-            "stage": "Proposal Sent",
-            "type": "OpportunityStageUpdate",
-            "eventId": "evt-123",
-            "occurredAt": "2026-02-15T10:00:00Z",
-            "monetaryValue": "2500.50",
         }
-        result = parse_ghl_webhook(payload)
+        _validated_tenant.cache_clear()
+        first = parse_ghl_webhook(payload)
+        second = parse_ghl_webhook(payload)
+
+        self.assertEqual(first.tenant_id, payload["tenant_id"])
+        self.assertEqual(second.tenant_id, payload["tenant_id"])
+        self.assertGreaterEqual(_validated_tenant.cache_info().hits, 1)
+        # Malformed hint is dropped so auth falls back to the location scan
+        result = parse_ghl_webhook({"tenant_id": "not-a-uuid", "opportunityId": "opp-1"})
+        self.assertIsNone(result.tenant_id)
+
+    def test_parser_handles_float_and_int_monetary_value(self):
+        for value, expected in ((2500.5, 2500.5), (2500, 2500.0), ("not-money", None)):
+            with self.subTest(value=value):
+                result = parse_ghl_webhook({"opportunityId": "opp-1", "monetaryValue": value})
+                self.assertEqual(result.lead_value, expected)
+                if expected is not None:
+                    self.assertIs(type(result.lead_value), float)
 
-        self.assertEqual(result.provider, "ghl")
-        self.assertEqual(result.tenant_id, payload["tenant_id"])
-        self.assertEqual(result.lead_external_id, "opp-1")
-        self.assertEqual(result.contact_external_id, "contact-1")
-        self.assertEqual(result.raw_stage, "Proposal Sent")
+    def test_raw_stage_is_only_trimmed(self):
+        # engine.stage_mappings matches raw_stage exactly — no case folding
+        # or whitespace collapsing in the parser
+        result = parse_ghl_webhook({"opportunityId": "opp-1", "stage": " Proposal   Sent "})
+        self.assertEqual(result.raw_stage, "Proposal   Sent")
         self.assertEqual(result.event_type, "stage_changed")
-        self.assertEqual(result.source_event_id, "evt-123")
-        self.assertEqual(result.lead_value, 2500.5)
-        self.assertEqual(result.location_id, "loc-123")
+
+    def test_parser_rejects_payload_without_lead_id(self):
+        payload = dict(_BASE_PAYLOAD)
+        del payload["opportunityId"], payload["contactId"]
+        with self.assertRaises(ValueError):
+            parse_ghl_webhook(payload)
+
+    def test_batch_parser_returns_same_as_singleton(self):
+        payloads = [
+            {"opportunityId": "opp-1", "type": "OpportunityCreate", "occurredAt": 1771149600},
+            {"opportunityId": "opp-2", "stage": "Won", "occurredAt": "2026-02-15T10:00:00Z"},
+            {"contactId": "contact-3", "occurredAt": "2026-02-15T10:00:00+01:00"},
+        ]
+        self.assertEqual(parse_ghl_webhooks(payloads), [parse_ghl_webhook(p) for p in payloads])
+        self.assertEqual(parse_ghl_webhooks(iter(payloads[:1])), [parse_ghl_webhook(payloads[0])])
+
+    def test_constant_outputs_are_interned(self):
+        staged = parse_ghl_webhook({"opportunityId": "opp-1", "type": "OpportunityStageUpdate"})
+        created = parse_ghl_webhook({"opportunityId": "opp-1", "type": "SomethingNew"})
+
+        self.assertIs(staged.provider, sys.intern("ghl"))
+        self.assertIs(staged.event_type, sys.intern("stage_changed"))
+        self.assertIs(created.event_type, sys.intern("lead_created"))
+
+    def test_occurred_at_parsed_to_utc(self):
+        cases = (
+            ("2026-02-15T10:00:00Z", datetime(2026, 2, 15, 10, 0, 0, tzinfo=timezone.utc)),
+            ("2026-02-15T10:00:00.123+00:00", datetime(2026, 2, 15, 10, 0, 0, 123000, tzinfo=timezone.utc)),
+        )
+        for raw, expected in cases:
+            with self.subTest(occurredAt=raw):
+                result = parse_ghl_webhook({"opportunityId": "opp-1", "occurredAt": raw})
+                self.assertEqual(result.occurred_at, expected)
+                self.assertEqual(result.occurred_at.utcoffset(), timedelta(0))
+
+    def test_raw_payload_keeps_unknown_keys(self):
+        payload = {
+            "opportunityId": "opp-1",
+            "customData": {"campaign": "spring"},
+            "garbage": "x",
+        }
+        result = parse_ghl_webhook(payload)
+
+        self.assertIs(result.raw_payload, payload)
+        self.assertEqual(result.raw_payload["customData"], {"campaign": "spring"})
+        self.assertEqual(result.raw_payload["garbage"], "x")
+
+    def test_parser_accepts_either_case_tenant_id(self):
+        for tenant_id in (
+            "abcdef01-2345-6789-abcd-ef0123456789",
+            "ABCDEF01-2345-6789-ABCD-EF0123456789",
+        ):
+            with self.subTest(tenant_id=tenant_id):
+                result = parse_ghl_webhook({"tenant_id": tenant_id, "opportunityId": "opp-1"})
+                self.assertEqual(result.tenant_id, tenant_id)
+
+    def test_parser_rejects_malformed_tenant_id(self):
+        for tenant_id in (
+            "abcdef01-2345-6789-abcd-ef012345678",
+            "abcdef0123456789abcdef0123456789",
+            "ghijkl01-2345-6789-abcd-ef0123456789",
+            "{abcdef01-2345-6789-abcd-ef0123456789}",
+        ):
+            with self.subTest(tenant_id=tenant_id):
+                result = parse_ghl_webhook({"tenantId": tenant_id, "opportunityId": "opp-1"})
+                self.assertIsNone(result.tenant_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from app.outreach.admission import AdmissionController
+
+
+async def _settle() -> None:
+    # Let woken waiters run up to their next await
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class AdmissionControllerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_acquire_blocks_at_limit_until_release(self):
+        admission = AdmissionController(2)
+        await admission.acquire()
+        await admission.acquire()
+
+        waiter = asyncio.create_task(admission.acquire())
+        await _settle()
+        self.assertFalse(waiter.done())
+        self.assertEqual(admission.active, 2)
+
+        await admission.release()
+        await _settle()
+        self.assertTrue(waiter.done())
+        self.assertEqual(admission.active, 2)
+
+    async def test_context_manager_releases_on_error(self):
+        admission = AdmissionController(1)
+        with self.assertRaises(RuntimeError):
+            async with admission:
+                self.assertEqual(admission.active, 1)
+                raise RuntimeError("boom")
+        self.assertEqual(admission.active, 0)
+
+    async def test_growing_limit_wakes_waiters(self):
+        admission = AdmissionController(3)
+        await admission.resize(1)
+        await admission.acquire()
+
+        waiters = [asyncio.create_task(admission.acquire()) for _ in range(2)]
+        await _settle()
+        self.assertEqual(sum(w.done() for w in waiters), 0)
+
+        await admission.resize(3)
+        await _settle()
+        self.assertEqual(sum(w.done() for w in waiters), 2)
+        self.assertEqual(admission.active, 3)
+
+    async def test_shrinking_limit_applies_as_calls_finish(self):
+        admission = AdmissionController(2)
+        await admission.acquire()
+        await admission.acquire()
+        await admission.resize(1)
+
+        waiter = asyncio.create_task(admission.acquire())
+        await admission.release()
+        await _settle()
+        # Still one in flight, which is the new limit
+        self.assertFalse(waiter.done())
+
+        await admission.release()
+        await _settle()
+        self.assertTrue(waiter.done())
+        self.assertEqual(admission.active, 1)
+
+    async def test_rate_limit_halves_and_success_grows_back(self):
+        admission = AdmissionController(8)
+        await admission.on_rate_limited()
+        self.assertEqual(admission.limit, 4)
+        await admission.on_rate_limited()
+        await admission.on_rate_limited()
+        await admission.on_rate_limited()
+        # Never below min_limit
+        self.assertEqual(admission.limit, 1)
+
+        for _ in range(10):
+            await admission.on_success()
+        # Never above the configured limit
+        self.assertEqual(admission.limit, 8)
+
+    async def test_resize_is_clamped(self):
+        admission = AdmissionController(4, min_limit=2)
+        await admission.resize(0)
+        self.assertEqual(admission.limit, 2)
+        await admission.resize(100)
+        self.assertEqual(admission.limit, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from anthropic import APIStatusError
+
+from app.outreach.admission import AdmissionController
+from app.outreach.pipeline import _claude_error_status, _retry_claude
+
+
+def _status_error(status: int, body: dict, headers: dict | None = None) -> APIStatusError:
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    response = httpx.Response(status, request=request, headers=headers)
+    return APIStatusError(str(body), response=response, body=body)
+
+
+# What the SDK raises for an SSE error event — the stream itself opened with 200
+_MID_STREAM_OVERLOADED = {
+    "type": "error",
+    "error": {"type": "overloaded_error", "message": "Overloaded"},
+}
+
+
+class ClaudeRetryTests(unittest.IsolatedAsyncioTestCase):
+    def test_mid_stream_overloaded_error_is_classified_as_529(self):
+        self.assertEqual(_claude_error_status(_status_error(200, _MID_STREAM_OVERLOADED)), 529)
+        self.assertEqual(_claude_error_status(_status_error(500, {"type": "error"})), 500)
+
+    async def test_mid_stream_overloaded_error_is_retried_and_shrinks_admission(self):
+        admission = AdmissionController(4)
+        make_call = AsyncMock(side_effect=[_status_error(200, _MID_STREAM_OVERLOADED), "ok"])
+
+        with patch("app.outreach.pipeline.asyncio.sleep", new=AsyncMock()) as sleep:
+            result = await _retry_claude(make_call, 3, admission)
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(make_call.await_count, 2)
+        sleep.assert_awaited_once()
+        # Halved to 2 on the overloaded error, then +1 on the successful retry
+        self.assertEqual(admission.limit, 3)
+        self.assertEqual(admission.active, 0)
+
+    async def test_server_error_is_retried_without_shrinking_admission(self):
+        admission = AdmissionController(4)
+        make_call = AsyncMock(side_effect=[_status_error(503, {"type": "error"}), "ok"])
+
+        with patch("app.outreach.pipeline.asyncio.sleep", new=AsyncMock()):
+            result = await _retry_claude(make_call, 3, admission)
+
+        self.assertEqual(result, "ok")
+        self.assertEqual(admission.limit, 4)
+        self.assertEqual(admission.active, 0)
+
+    async def test_retry_after_is_capped(self):
+        error = _status_error(429, {"type": "error"}, headers={"retry-after": "3600"})
+        make_call = AsyncMock(side_effect=[error, "ok"])
+
+        with patch("app.outreach.pipeline.asyncio.sleep", new=AsyncMock()) as sleep:
+            await _retry_claude(make_call, 3)
+
+        self.assertEqual(sleep.await_args.args[0], 30.0)
+
+    async def test_non_retryable_error_is_raised(self):
+        make_call = AsyncMock(side_effect=_status_error(400, {"type": "error"}))
+
+        with self.assertRaises(APIStatusError):
+            await _retry_claude(make_call, 3)
+        self.assertEqual(make_call.await_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()